@@ -0,0 +1,71 @@
+"""
+Model Cache
+===========
+
+Process-wide cache for sentence-transformers models so that several guards
+(or several instances of the same guard) share one set of loaded weights.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+
+def _torch_dtype(dtype: Optional[str]):
+    """Map 'fp16'/'bf16' to a torch dtype; ``None`` picks fp16 on CUDA."""
+    import torch
+    if dtype is None:
+        dtype = 'fp16' if torch.cuda.is_available() else None
+    return {'fp16': torch.float16, 'bf16': torch.bfloat16}.get(dtype)
+
+
+def _model_kwargs(backend: str, file_name: Optional[str], dtype: Optional[str]) -> Optional[Dict[str, Any]]:
+    kwargs: Dict[str, Any] = {}
+    if file_name:
+        kwargs['file_name'] = file_name
+    if backend == 'torch':
+        # Reduced precision only applies to the PyTorch backend
+        torch_dtype = _torch_dtype(dtype)
+        if torch_dtype is not None:
+            kwargs['torch_dtype'] = torch_dtype
+    return kwargs or None
+
+
+@lru_cache(maxsize=8)
+def get_cross_encoder(model_name: str, backend: str = 'torch', file_name: Optional[str] = None,
+                      dtype: Optional[str] = None):
+    """Return a shared ``CrossEncoder`` for the given model, backend and dtype."""
+    from sentence_transformers import CrossEncoder
+    model_kwargs = _model_kwargs(backend, file_name, dtype)
+    if backend == 'torch' and not model_kwargs:
+        return CrossEncoder(model_name)
+    return CrossEncoder(model_name, backend=backend, model_kwargs=model_kwargs)
+
+
+@lru_cache(maxsize=8)
+def get_cross_encoder_or_torch(model_name: str, backend: str, file_name: Optional[str] = None,
+                               dtype: Optional[str] = None):
+    """Like ``get_cross_encoder``, falling back to PyTorch if the backend cannot load.
+
+    Any load error triggers the fallback: sentence-transformers reports a
+    missing ``optimum``/``onnxruntime`` as a plain ``Exception``. Errors that
+    are not backend-specific, such as a bad model name, still surface from
+    the PyTorch load. The outcome is cached, so a failed load is attempted
+    once per model. ``dtype`` only applies to the PyTorch fallback.
+    """
+    if backend != 'torch':
+        try:
+            return get_cross_encoder(model_name, backend, file_name)
+        except Exception:
+            pass
+    return get_cross_encoder(model_name, dtype=dtype)
+
+
+@lru_cache(maxsize=8)
+def get_sentence_transformer(model_name: str, backend: str = 'torch', file_name: Optional[str] = None,
+                             dtype: Optional[str] = None):
+    """Return a shared ``SentenceTransformer`` for the given model, backend and dtype."""
+    from sentence_transformers import SentenceTransformer
+    model_kwargs = _model_kwargs(backend, file_name, dtype)
+    if backend == 'torch' and not model_kwargs:
+        return SentenceTransformer(model_name)
+    return SentenceTransformer(model_name, backend=backend, model_kwargs=model_kwargs)
@@ -6,12 +6,21 @@ Detects potential biases in generated text related to gender, race, religion, et
 """
 
 import re
+from collections import defaultdict
 from typing import List, Dict
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 class BiasDetector:
     """
     Simple keyword-based bias detector.
     In a real application, use a trained classifier or specific bias-detection models.
+
+    All terms are matched in a single pass over the text, using an
+    Aho–Corasick automaton when ``pyahocorasick`` is installed and a compiled
+    regex union otherwise.
     """
     def __init__(self):
         self.bias_terms = {
@@ -24,20 +33,55 @@ class BiasDetector:
             ],
             # Add more categories and terms
         }
-        
+        # Terms are matched against lowercased text, so store them lowercased too
+        self.bias_terms = {cat: [t.lower() for t in terms] for cat, terms in self.bias_terms.items()}
+        self._build_matcher()
+
+    def _build_matcher(self) -> None:
+        # term -> categories it belongs to
+        self._term_categories: Dict[str, List[str]] = defaultdict(list)
+        for category, terms in self.bias_terms.items():
+            for term in terms:
+                self._term_categories[term].append(category)
+        terms = list(self._term_categories)
+
+        if ahocorasick:
+            self._automaton = ahocorasick.Automaton()
+            for term in terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            # Longest alternative first; the lookahead lets matches overlap
+            by_length = sorted(terms, key=len, reverse=True)
+            self._union = re.compile("(?=(" + "|".join(map(re.escape, by_length)) + "))")
+            # Shorter terms that start where a longer term matched
+            self._prefix_terms = {
+                t: [u for u in terms if u != t and t.startswith(u)] for t in terms
+            }
+
+    def _find_terms(self, text_lower: str) -> set:
+        if self._automaton is not None:
+            return {term for _, term in self._automaton.iter(text_lower)}
+        hits = set()
+        for m in self._union.finditer(text_lower):
+            term = m.group(1)
+            hits.add(term)
+            hits.update(self._prefix_terms[term])
+        return hits
+
     def check_bias(self, text: str) -> Dict[str, List[str]]:
         """
         Check for presence of potentially biased phrases.
         Returns a dict of category -> found terms.
         """
+        hits = self._find_terms(text.lower())
+        if not hits:
+            return {}
+
         found_biases = {}
-        text_lower = text.lower()
-        
         for category, terms in self.bias_terms.items():
-            found = []
-            for term in terms:
-                if term in text_lower:
-                    found.append(term)
+            found = [term for term in terms if term in hits]
             if found:
                 found_biases[category] = found
                 
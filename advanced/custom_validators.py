@@ -6,8 +6,18 @@ Base classes and examples for creating custom guardrail validators.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+from basics._regex import compile_pattern, fusable
 
 @dataclass
 class ValidationResult:
@@ -24,10 +34,15 @@ class BaseValidator(ABC):
         pass
 
 class RegexValidator(BaseValidator):
-    """Validator that checks if input matches a regex pattern."""
+    """Validator that checks if input matches a regex pattern.
+
+    Patterns are compiled with RE2 when ``google-re2`` is installed, which
+    guarantees linear-time matching on user-supplied patterns. Patterns RE2
+    cannot match exactly like ``re`` (backreferences, ``\\b``, ``$``, ...)
+    fall back to Python's ``re``; see ``basics._regex.compile_pattern``.
+    """
     def __init__(self, pattern: str, error_msg: str = "Pattern mismatch"):
-        import re
-        self.pattern = re.compile(pattern)
+        self.pattern = compile_pattern(pattern)
         self.error_msg = error_msg
 
     def validate(self, value: str, **kwargs) -> ValidationResult:
@@ -36,19 +51,106 @@ class RegexValidator(BaseValidator):
         return ValidationResult(is_valid=False, error_message=self.error_msg)
 
 class KeywordValidator(BaseValidator):
-    """Validator that checks for presence/absence of keywords."""
+    """Validator that checks for presence/absence of keywords (case-insensitive).
+
+    With ``pyahocorasick`` installed all keywords are searched in a single
+    pass that stops at the first hit.
+    """
     def __init__(self, keywords: list[str], must_contain: bool = True):
         self.keywords = keywords
         self.must_contain = must_contain
+        self._lower_keywords = [kw.lower() for kw in keywords]
+        self._automaton = None
+        if ahocorasick and keywords and all(keywords):
+            self._automaton = ahocorasick.Automaton()
+            for kw in self._lower_keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
 
     def validate(self, value: str, **kwargs) -> ValidationResult:
-        found = any(kw in value for kw in self.keywords)
+        value = value.lower()
+        if self._automaton is not None:
+            found = next(self._automaton.iter(value), None) is not None
+        else:
+            found = any(kw in value for kw in self._lower_keywords)
         if self.must_contain and not found:
             return ValidationResult(is_valid=False, error_message=f"Must contain one of: {self.keywords}")
         if not self.must_contain and found:
             return ValidationResult(is_valid=False, error_message=f"Must not contain: {self.keywords}")
         return ValidationResult(is_valid=True)
 
+class HyperscanValidator(BaseValidator):
+    """Validator that scans for several regex patterns in a single pass.
+
+    The patterns are compiled into one Hyperscan database when ``hyperscan``
+    is installed, otherwise into one regex union. Patterns Hyperscan rejects
+    (e.g. backreferences) or that cannot be embedded in the union (inline
+    flags, own groups) are searched with their own regex instead. By default
+    a value is invalid if any pattern matches; with ``must_match=True`` it is
+    invalid if none do.
+    """
+    def __init__(self, patterns: List[str], error_msg: str = "Forbidden pattern", must_match: bool = False):
+        self.patterns = patterns
+        self.error_msg = error_msg
+        self.must_match = must_match
+        self._db = None
+        self._union = None
+        if hyperscan is not None:
+            fused = [p for p in patterns if self._hyperscan_accepts(p)]
+            if fused:
+                self._db = self._compile_database(fused)
+        else:
+            fused = [p for p in patterns if fusable(p)]
+            if fused:
+                self._union = compile_pattern("|".join(f"(?:{p})" for p in fused))
+        self._separate = [compile_pattern(p) for p in patterns if p not in fused]
+
+    @staticmethod
+    def _compile_database(patterns: List[str]):
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[p.encode() for p in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            # UTF-8 input with Unicode classes, matching ``re``'s \w/\b/\s
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP]
+            * len(patterns),
+        )
+        return db
+
+    @classmethod
+    def _hyperscan_accepts(cls, pattern: str) -> bool:
+        try:
+            cls._compile_database([pattern])
+        except hyperscan.error:
+            return False
+        return True
+
+    def _matches(self, value: str) -> bool:
+        if self._union is not None and self._union.search(value):
+            return True
+        if self._db is not None:
+            hits = []
+            def on_match(pattern_id, start, end, flags, context):
+                hits.append(pattern_id)
+                return True  # stop scanning on first match
+            try:
+                self._db.scan(value.encode(), match_event_handler=on_match)
+            except hyperscan.ScanTerminated:
+                pass  # raised when on_match stops the scan, i.e. after a hit
+            if hits:
+                return True
+        return any(r.search(value) for r in self._separate)
+
+    def validate(self, value: str, **kwargs) -> ValidationResult:
+        if self._matches(value) != self.must_match:
+            return ValidationResult(is_valid=False, error_message=self.error_msg)
+        return ValidationResult(is_valid=True)
+
+    def validate_batch(self, values: List[str], **kwargs) -> List[ValidationResult]:
+        """Validate many strings against the same compiled pattern set."""
+        return [self.validate(v, **kwargs) for v in values]
+
 if __name__ == "__main__":
     v1 = RegexValidator(r"^\d+$", "Must be digits")
     print(f"Digits check '123': {v1.validate('123')}")
@@ -56,3 +158,6 @@ if __name__ == "__main__":
 
     v2 = KeywordValidator(["urgent", "asap"], must_contain=True)
     print(f"Keyword check 'please do this asap': {v2.validate('please do this asap')}")
+
+    v3 = HyperscanValidator([r"rm\s+-rf", r"drop\s+table"], "Dangerous command")
+    print(f"Batch check: {v3.validate_batch(['ls -la', 'rm -rf /', 'drop table users'])}")
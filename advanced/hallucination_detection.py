@@ -6,23 +6,55 @@ Techniques to detect potential hallucinations by comparing output against
 source documents or knowledge base.
 """
 
-from typing import List
+import warnings
+from typing import List, Optional, Tuple, Union
 try:
+    import numpy as np
     from sentence_transformers import CrossEncoder
 except ImportError:
     CrossEncoder = None
 
+from ._model_cache import get_cross_encoder_or_torch
+
 class HallucinationDetector:
     """
     Uses a Natural Language Inference (NLI) model to check if the output
     is entailed by the provided context/source.
     """
-    def __init__(self, model_name: str = 'cross-encoder/nli-deberta-v3-base'):
+    def __init__(
+        self,
+        model_name: str = 'cross-encoder/nli-deberta-v3-base',
+        backend: str = 'onnx',
+        file_name: Optional[str] = 'onnx/model_qint8_avx512_vnni.onnx',
+        dtype: Optional[str] = None
+    ):
+        """
+        Args:
+            model_name: Hugging Face id of the NLI cross-encoder
+            backend: Inference backend ('torch', 'onnx' or 'openvino')
+            file_name: Model file to load for the ONNX/OpenVINO backends
+            dtype: 'fp16', 'bf16' or 'fp32' for the PyTorch backend; ``None``
+                uses fp16 when CUDA is available and fp32 otherwise. With
+                another backend it only applies if loading falls back to PyTorch
+
+        The int8 ONNX file is produced once with sentence-transformers'
+        ``export_dynamic_quantized_onnx_model(model, "avx512_vnni", model_name)``
+        (see also the ``"O3"`` optimization level of
+        ``export_optimized_onnx_model``). If the requested backend or file is
+        unavailable, the default PyTorch backend is used instead; that decision
+        is made once per model. Loaded models are shared process-wide, so
+        repeated construction reuses the weights.
+        """
+        if dtype is not None and backend != 'torch':
+            warnings.warn(
+                f"dtype={dtype!r} is ignored by the {backend!r} backend unless it falls back to PyTorch",
+                stacklevel=2,
+            )
         if CrossEncoder:
-            self.model = CrossEncoder(model_name)
+            self.model = get_cross_encoder_or_torch(model_name, backend, file_name, dtype)
             # Label mapping for this specific model: 0: contradiction, 1: entailment, 2: neutral
             # Note: mappings can vary by model!
-            self.label_mapping = ['contradiction', 'entailment', 'neutral']
+            self.label_mapping = np.array(['contradiction', 'entailment', 'neutral'])
         else:
             self.model = None
             print("Warning: sentence-transformers not installed.")
@@ -32,18 +64,34 @@ class HallucinationDetector:
         Check relationship between premise (source) and hypothesis (output).
         Returns: 'entailment', 'contradiction', or 'neutral'
         """
+        return self.check_entailment_batch([(premise, hypothesis)])[0]
+
+    def check_entailment_batch(self, pairs: List[Tuple[str, str]], batch_size: int = 32) -> List[str]:
+        """
+        Check many (premise, hypothesis) pairs with a single batched predict call.
+        Returns one label per pair, in input order.
+        """
         if not self.model:
-            return "unknown"
-        
-        scores = self.model.predict([(premise, hypothesis)])
-        label_index = scores[0].argmax()
-        return self.label_mapping[label_index]
+            return ["unknown"] * len(pairs)
+        if not pairs:
+            return []
 
-    def is_hallucination(self, source: str, output: str) -> bool:
+        scores = self.model.predict(pairs, batch_size=batch_size)
+        return self.label_mapping[scores.argmax(axis=1)].tolist()
+
+    def is_hallucination(self, source: Union[str, List[str]], output: Union[str, List[str]]) -> Union[bool, List[bool]]:
         """
         Returns True if output contradicts the source.
         Note: 'neutral' might also be considered hallucination depending on strictness.
+
+        If ``output`` is a list, every item is checked in one batch (against
+        ``source``, or the matching item when ``source`` is a list too) and a
+        list of booleans is returned.
         """
+        if isinstance(output, list):
+            sources = source if isinstance(source, list) else [source] * len(output)
+            results = self.check_entailment_batch(list(zip(sources, output)))
+            return [r == 'contradiction' for r in results]
         result = self.check_entailment(source, output)
         return result == 'contradiction'
 
@@ -59,10 +107,10 @@ if __name__ == "__main__":
         ]
         
         print(f"Source: {source}\n")
-        for out in outputs:
-            rel = detector.check_entailment(source, out)
+        relations = detector.check_entailment_batch([(source, out) for out in outputs])
+        for out, rel in zip(outputs, relations):
             print(f"Output: {out}")
             print(f"Relationship: {rel}")
-            print(f"Is Hallucination (Contradiction)? {detector.is_hallucination(source, out)}\n")
+            print(f"Is Hallucination (Contradiction)? {rel == 'contradiction'}\n")
     else:
         print("Please install sentence-transformers to run this example.")
@@ -7,21 +7,32 @@ Useful for checking if the output is semantically similar to a reference or
 if it deviates too much from the expected topic.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 try:
     from sentence_transformers import SentenceTransformer, util
 except ImportError:
     SentenceTransformer = None
 
+from ._model_cache import get_sentence_transformer
+
 class SemanticValidator:
     """
     Uses a sentence transformer model to calculate cosine similarity
     between the output and a reference text or a set of allowed topics.
     """
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', threshold: float = 0.5):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', threshold: float = 0.5, dtype: Optional[str] = None):
+        """
+        Args:
+            model_name: Sentence-transformers model to load
+            threshold: Minimum cosine similarity to pass
+            dtype: 'fp16', 'bf16' or 'fp32'; ``None`` uses fp16 when CUDA is
+                available and fp32 otherwise
+        """
         self.threshold = threshold
+        # tuple(topics) -> normalized topic embeddings
+        self._topic_cache: Dict[Tuple[str, ...], Any] = {}
         if SentenceTransformer:
-            self.model = SentenceTransformer(model_name)
+            self.model = get_sentence_transformer(model_name, dtype=dtype)
         else:
             self.model = None
             print("Warning: sentence-transformers not installed. SemanticValidator will not work.")
@@ -35,20 +46,40 @@ class SemanticValidator:
         sim = util.cos_sim(embeddings[0], embeddings[1])
         return sim.item() >= self.threshold
 
+    def _topic_embeddings(self, allowed_topics: List[str]):
+        """Encode (and cache) normalized embeddings for a topic list."""
+        key = tuple(allowed_topics)
+        topic_embs = self._topic_cache.get(key)
+        if topic_embs is None:
+            topic_embs = self.model.encode(allowed_topics, convert_to_tensor=True, normalize_embeddings=True)
+            self._topic_cache[key] = topic_embs
+        return topic_embs
+
     def validate_topic(self, output: str, allowed_topics: List[str]) -> bool:
         """Check if output matches one of the allowed topics."""
         if not self.model:
             return True
 
-        output_emb = self.model.encode(output)
-        topic_embs = self.model.encode(allowed_topics)
+        output_emb = self.model.encode(output, convert_to_tensor=True, normalize_embeddings=True)
+        topic_embs = self._topic_embeddings(allowed_topics)
         
-        # Check max similarity against any topic
-        sims = util.cos_sim(output_emb, topic_embs)
-        max_sim = sims.max().item()
+        # Embeddings are unit length, so the dot product is the cosine similarity
+        max_sim = (output_emb @ topic_embs.T).max().item()
         
         return max_sim >= self.threshold
 
+    def validate_topic_batch(self, outputs: List[str], allowed_topics: List[str]) -> List[bool]:
+        """Check many outputs against the allowed topics with one matrix product."""
+        if not self.model:
+            return [True] * len(outputs)
+        if not outputs:
+            return []
+
+        output_embs = self.model.encode(outputs, convert_to_tensor=True, normalize_embeddings=True)
+        topic_embs = self._topic_embeddings(allowed_topics)
+        max_sims = (output_embs @ topic_embs.T).max(dim=1).values
+        return (max_sims >= self.threshold).tolist()
+
 if __name__ == "__main__":
     if SentenceTransformer:
         validator = SemanticValidator(threshold=0.4)
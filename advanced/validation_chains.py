@@ -5,31 +5,90 @@ Validation Chains
 Utilities to chain multiple validators together.
 """
 
-from typing import List, Any
+import time
+from typing import List, Any, Dict
 from .custom_validators import BaseValidator, ValidationResult
 
+class _TimedValidator:
+    """Wraps a validator and accumulates its wall time."""
+    def __init__(self, validator: BaseValidator):
+        self.validator = validator
+        self.sum_time = 0.0
+        self.count = 0
+
+    @property
+    def mean_time(self) -> float:
+        # Unmeasured validators sort first so they get profiled next window
+        return self.sum_time / self.count if self.count else 0.0
+
+    def validate(self, value: Any, **kwargs) -> ValidationResult:
+        start = time.perf_counter()
+        result = self.validator.validate(value, **kwargs)
+        self.sum_time += time.perf_counter() - start
+        self.count += 1
+        return result
+
 class ValidationChain:
     """
     Executes a sequence of validators.
     Can stop on first failure or collect all errors.
+
+    With ``stop_on_fail`` the chain profiles each validator and, every
+    ``warmup_calls`` calls, reorders them cheapest-first so inexpensive
+    checks reject bad input before costly ones run. Results are returned
+    in execution order. ``validators`` may be edited between calls; added
+    validators start unmeasured and removed ones are dropped.
     """
-    def __init__(self, validators: List[BaseValidator], stop_on_fail: bool = True):
-        self.validators = validators
+    def __init__(self, validators: List[BaseValidator], stop_on_fail: bool = True, warmup_calls: int = 50):
+        self.validators = list(validators)
         self.stop_on_fail = stop_on_fail
+        self.warmup_calls = warmup_calls
+        self._timed = [_TimedValidator(v) for v in self.validators]
+        self._calls = 0
+
+    def _sync(self) -> None:
+        """Rebuild the timed list if ``self.validators`` was edited, keeping timings."""
+        if len(self._timed) == len(self.validators) and all(
+            t.validator is v for t, v in zip(self._timed, self.validators)
+        ):
+            return
+        known = {id(t.validator): t for t in self._timed}
+        self._timed = [known.get(id(v)) or _TimedValidator(v) for v in self.validators]
+
+    def _reorder(self) -> None:
+        self._timed.sort(key=lambda t: t.mean_time)
+        self.validators = [t.validator for t in self._timed]
 
     def validate(self, value: Any, **kwargs) -> List[ValidationResult]:
+        self._sync()
         results = []
-        for validator in self.validators:
+        for validator in self._timed:
             result = validator.validate(value, **kwargs)
             results.append(result)
             if self.stop_on_fail and not result.is_valid:
                 break
+
+        self._calls += 1
+        if self.stop_on_fail and self.warmup_calls and self._calls % self.warmup_calls == 0:
+            self._reorder()
         return results
 
     def is_valid(self, value: Any, **kwargs) -> bool:
         results = self.validate(value, **kwargs)
         return all(r.is_valid for r in results)
 
+    def explain(self) -> List[Dict[str, Any]]:
+        """Return the current validator order with measured cost estimates."""
+        self._sync()
+        return [
+            {
+                "validator": type(t.validator).__name__,
+                "calls": t.count,
+                "mean_time_ms": t.mean_time * 1000,
+            }
+            for t in self._timed
+        ]
+
 if __name__ == "__main__":
     from .custom_validators import RegexValidator, KeywordValidator
     
@@ -42,3 +101,4 @@ if __name__ == "__main__":
     print(f"Check '12345': {chain.is_valid('12345')}")
     print(f"Check 'abc': {chain.validate('abc')}")
     print(f"Check '123666': {chain.validate('123666')}")
+    print(f"Learned order: {chain.explain()}")
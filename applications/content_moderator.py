@@ -13,13 +13,13 @@ import glob
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from intermediate.toxic_content_detection import ToxicDetector
-from intermediate.pii_detection import PIIDetector
+from intermediate.toxic_content_detection import get_toxic_detector
+from intermediate.pii_detection import get_pii_detector
 
 class ContentModerator:
     def __init__(self):
-        self.toxic_detector = ToxicDetector()
-        self.pii_detector = PIIDetector()
+        self.toxic_detector = get_toxic_detector()
+        self.pii_detector = get_pii_detector()
 
     def process_file(self, input_path: str, output_path: str):
         print(f"Processing {input_path}...")
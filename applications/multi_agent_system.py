@@ -13,7 +13,7 @@ import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from basics.input_validation import InputValidator
-from intermediate.toxic_content_detection import ToxicDetector
+from intermediate.toxic_content_detection import get_toxic_detector
 
 class Agent:
     def __init__(self, name: str):
@@ -31,7 +31,7 @@ class GuardedAgent(Agent):
     def __init__(self, name: str):
         super().__init__(name)
         self.validator = InputValidator(max_length=100)
-        self.toxic_detector = ToxicDetector()
+        self.toxic_detector = get_toxic_detector()
 
     def send(self, message: str, recipient: 'Agent'):
         # Outgoing guardrail
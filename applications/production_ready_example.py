@@ -3,62 +3,108 @@ Production Ready Example (FastAPI)
 ==================================
 
 Skeleton of a production-ready API service using FastAPI and guardrails.
-Requires: pip install fastapi uvicorn
+Requires: pip install fastapi uvicorn msgspec uvloop httptools
 """
 
 try:
-    from fastapi import FastAPI, HTTPException
-    from pydantic import BaseModel
+    from fastapi import FastAPI, HTTPException, Request, Response
 except ImportError:
     FastAPI = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+try:
+    import httptools
+except ImportError:
+    httptools = None
 
 import sys
 import os
+from functools import lru_cache
+from typing import Optional
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from basics.input_validation import InputValidator
-from intermediate.pii_detection import PIIDetector
+from intermediate.pii_detection import get_pii_detector
 
-if FastAPI:
+
+@lru_cache(maxsize=1)
+def get_validator() -> InputValidator:
+    """Return the process-wide input validator, built on first use."""
+    return InputValidator(max_length=1000)
+
+
+if FastAPI and msgspec:
     app = FastAPI(title="Guarded LLM API")
-    
-    # Initialize validators once
-    input_validator = InputValidator(max_length=1000)
-    pii_detector = PIIDetector()
 
-    class GenerateRequest(BaseModel):
+    # msgspec structs instead of Pydantic models: InputValidator is the
+    # authoritative check, so the request is only decoded, not re-validated
+    class GenerateRequest(msgspec.Struct):
         prompt: str
         max_tokens: int = 100
 
-    class GenerateResponse(BaseModel):
+    class GenerateResponse(msgspec.Struct):
         text: str
         status: str
 
-    @app.post("/generate", response_model=GenerateResponse)
-    async def generate(request: GenerateRequest):
+    @app.post("/generate", response_model=None)
+    async def generate(request: Request) -> Response:
+        try:
+            body = msgspec.json.decode(await request.body(), type=GenerateRequest)
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        prompt = body.prompt
+        input_validator = get_validator()
+        pii_detector = get_pii_detector()
+
         # 1. Input Validation
-        val_res = input_validator.validate(request.prompt)
+        val_res = input_validator.validate(prompt)
         if val_res.status.value == "invalid":
             raise HTTPException(status_code=400, detail=val_res.message)
 
         # 2. PII Check
-        if pii_detector.check(request.prompt).value == "found":
+        if pii_detector.check(prompt).value == "found":
             # Policy: Redact PII before processing
-            request.prompt = pii_detector.redact(request.prompt)
+            prompt = pii_detector.redact(prompt)
 
         # 3. Mock Generation
-        generated_text = f"Processed: {request.prompt}"
+        generated_text = f"Processed: {prompt}"
 
-        return GenerateResponse(text=generated_text, status="success")
+        return Response(
+            content=msgspec.json.encode(GenerateResponse(text=generated_text, status="success")),
+            media_type="application/json",
+        )
 
-    def run():
+    def run(workers: Optional[int] = None):
         import uvicorn
         print("Starting server on http://localhost:8000")
-        uvicorn.run(app, host="0.0.0.0", port=8000)
+        # libuv event loop and the C HTTP parser instead of asyncio + h11,
+        # when installed (uvicorn fails hard if asked for missing ones).
+        # Multiple workers need the app as an import string. To share the
+        # validators' compiled patterns copy-on-write, serve under
+        # gunicorn --preload with uvicorn workers and call get_validator()
+        # before forking.
+        uvicorn.run(
+            "applications.production_ready_example:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop" if uvloop else "auto",
+            http="httptools" if httptools else "auto",
+            workers=workers or os.cpu_count(),
+        )
+
+elif FastAPI:
+    def run(workers: Optional[int] = None):
+        print("msgspec not installed. Run: pip install msgspec")
 
 else:
-    def run():
-        print("FastAPI not installed. Run: pip install fastapi uvicorn")
+    def run(workers: Optional[int] = None):
+        print("FastAPI not installed. Run: pip install fastapi uvicorn msgspec uvloop httptools")
 
 if __name__ == "__main__":
     run()
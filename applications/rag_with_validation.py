@@ -6,16 +6,88 @@ Retrieval-Augmented Generation (RAG) example with guardrails.
 Ensures that retrieved context is relevant and output is grounded (not hallucinated).
 """
 
+import asyncio
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from typing import List, Optional
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from advanced.hallucination_detection import HallucinationDetector
 from advanced.semantic_validation import SemanticValidator
 
+class SemanticCache:
+    """
+    Cache of (query embedding, response) pairs. A new query whose normalized
+    embedding has cosine similarity >= ``threshold`` with a cached query
+    reuses that response. The least recently used entry is replaced once
+    ``capacity`` entries are stored.
+
+    ``lookup`` and ``add`` take a lock, since batch queries use the cache
+    from executor threads while single queries use it on the event loop.
+    """
+    def __init__(self, model, threshold: float = 0.87, capacity: int = 1000):
+        self.model = model
+        self.threshold = threshold
+        self.capacity = capacity
+        self._emb = None          # (capacity, dim) float32, filled lazily
+        self._responses = []
+        self._last_used = None    # per-slot logical clock for LRU eviction
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def encode(self, query: str):
+        return self.model.encode([query], normalize_embeddings=True, convert_to_numpy=True)[0]
+
+    def lookup(self, query_emb) -> Optional[str]:
+        with self._lock:
+            if not self._responses:
+                return None
+            n = len(self._responses)
+            # Embeddings are unit length, so the dot product is the cosine similarity
+            sims = self._emb[:n] @ query_emb
+            best = int(sims.argmax())
+            if sims[best] < self.threshold:
+                return None
+            self._clock += 1
+            self._last_used[best] = self._clock
+            return self._responses[best]
+
+    def add(self, query_emb, response: str) -> None:
+        import numpy as np
+        with self._lock:
+            if self._emb is None:
+                self._emb = np.zeros((self.capacity, query_emb.shape[0]), dtype=np.float32)
+                self._last_used = np.zeros(self.capacity, dtype=np.int64)
+            if len(self._responses) < self.capacity:
+                slot = len(self._responses)
+                self._emb[slot] = query_emb
+                self._responses.append(response)
+            else:
+                slot = int(self._last_used.argmin())
+                self._emb[slot] = query_emb
+                self._responses[slot] = response
+            self._clock += 1
+            self._last_used[slot] = self._clock
+
 class SimpleRAG:
-    def __init__(self):
+    """
+    Toy RAG pipeline with guardrails.
+
+    ``retrieval_threshold`` is the minimum cosine similarity between a query
+    and a knowledge-base document for embedding retrieval to use it. The
+    instance owns a thread pool; call ``close()`` or use it as a context
+    manager to release it.
+    """
+    def __init__(self, retrieval_threshold: float = 0.5):
+        self.retrieval_threshold = retrieval_threshold
         # Mock knowledge base
         self.knowledge_base = {
             "python": "Python is a high-level, general-purpose programming language.",
@@ -31,10 +103,59 @@ class SimpleRAG:
             self.semantic_validator = None
             print("Warning: Advanced guardrails not available (missing dependencies).")
 
-    def retrieve(self, query: str) -> str:
+        # Reuse the semantic validator's MiniLM model for retrieval and the
+        # semantic cache, so no extra weights are loaded
+        self.encoder = getattr(self.semantic_validator, "model", None)
+        self.semantic_cache = SemanticCache(self.encoder) if self.encoder is not None else None
+
+        # One worker per core for the CPU-bound encoder and NLI calls
+        self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+        # Document embeddings are computed once, in a single batch
+        self._kb_keys = list(self.knowledge_base)
+        self._kb_emb = None
+        if self.encoder is not None:
+            self._kb_emb = self._encode(list(self.knowledge_base.values()))
+
+        # Keyword fallback: one automaton pass finds every KB key in the query
+        self._kb_ac = None
+        if ahocorasick and self._kb_keys:
+            self._kb_ac = ahocorasick.Automaton()
+            for idx, key in enumerate(self._kb_keys):
+                self._kb_ac.add_word(key, idx)
+            self._kb_ac.make_automaton()
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "SimpleRAG":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _encode(self, queries: List[str]):
+        return self.encoder.encode(queries, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+
+    def _best_match(self, sims) -> str:
+        idx = int(sims.argmax())
+        return self.knowledge_base[self._kb_keys[idx]] if sims[idx] > self.retrieval_threshold else ""
+
+    def retrieve(self, query: str, query_emb=None) -> str:
+        if self._kb_emb is not None:
+            if query_emb is None:
+                query_emb = self._encode([query])[0]
+            return self._best_match(self._kb_emb @ query_emb)
+
         # Simple keyword retrieval
+        q = query.lower()
+        if self._kb_ac is not None:
+            # Earliest KB entry wins, as with the linear scan
+            idx = min((i for _, i in self._kb_ac.iter(q)), default=None)
+            return self.knowledge_base[self._kb_keys[idx]] if idx is not None else ""
         for key, content in self.knowledge_base.items():
-            if key in query.lower():
+            if key in q:
                 return content
         return ""
 
@@ -44,11 +165,22 @@ class SimpleRAG:
             return "I don't know about that."
         return f"Based on the context: {context}"
 
-    def query(self, user_query: str) -> str:
+    async def query(self, user_query: str) -> str:
+        """Answer one query; a coroutine, so synchronous callers use ``asyncio.run``."""
         print(f"Query: {user_query}")
+        loop = asyncio.get_running_loop()
+
+        # 0. Semantic cache (the embedding is CPU/GPU work, so keep it off the loop)
+        query_emb = None
+        if self.semantic_cache:
+            query_emb = await loop.run_in_executor(self._executor, self.semantic_cache.encode, user_query)
+            cached = self.semantic_cache.lookup(query_emb)
+            if cached is not None:
+                print("Semantic cache hit")
+                return cached
         
         # 1. Retrieve
-        context = self.retrieve(user_query)
+        context = self.retrieve(user_query, query_emb)
         if not context:
             return "No relevant information found."
         print(f"Retrieved Context: {context}")
@@ -59,17 +191,64 @@ class SimpleRAG:
 
         # 3. Validate (Hallucination Check)
         if self.hallucination_detector:
-            # Check if response contradicts context
-            is_hallucination = self.hallucination_detector.is_hallucination(context, response)
+            # Check if response contradicts context; the NLI forward pass runs
+            # in the pool so other requests keep being served meanwhile
+            is_hallucination = await loop.run_in_executor(
+                self._executor, self.hallucination_detector.is_hallucination, context, response
+            )
             if is_hallucination:
                 return "[Blocked] Detected hallucination/contradiction."
-        
+
+        if query_emb is not None:
+            self.semantic_cache.add(query_emb, response)
         return response
 
+    async def batch_query(self, queries: List[str]) -> List[str]:
+        """Answer many queries at once without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._batch_query_sync, queries)
+
+    def _batch_query_sync(self, queries: List[str]) -> List[str]:
+        # One encoder call and one (kb x queries) matrix product for the batch
+        embs = self._encode(queries) if self.encoder is not None and queries else None
+        sims = self._kb_emb @ embs.T if embs is not None else None
+
+        results: List[Optional[str]] = [None] * len(queries)
+        pending = []  # (index, context, response)
+        for i, q in enumerate(queries):
+            if self.semantic_cache:
+                cached = self.semantic_cache.lookup(embs[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            context = self._best_match(sims[:, i]) if sims is not None else self.retrieve(q)
+            if not context:
+                results[i] = "No relevant information found."
+                continue
+            pending.append((i, context, self.generate(q, context)))
+
+        # Hallucination check for all generated answers in one NLI batch
+        flags = [False] * len(pending)
+        if self.hallucination_detector and pending:
+            flags = self.hallucination_detector.is_hallucination(
+                [c for _, c, _ in pending], [r for _, _, r in pending]
+            )
+        for (i, _, response), is_hallucination in zip(pending, flags):
+            if is_hallucination:
+                results[i] = "[Blocked] Detected hallucination/contradiction."
+                continue
+            results[i] = response
+            if self.semantic_cache:
+                self.semantic_cache.add(embs[i], response)
+        return results
+
 if __name__ == "__main__":
-    rag = SimpleRAG()
-    print("\n--- Test 1: Valid Query ---")
-    print(f"Final Answer: {rag.query('Tell me about python')}")
-    
-    print("\n--- Test 2: Unknown Topic ---")
-    print(f"Final Answer: {rag.query('Tell me about java')}")
+    with SimpleRAG() as rag:
+        print("\n--- Test 1: Valid Query ---")
+        print(f"Final Answer: {asyncio.run(rag.query('Tell me about python'))}")
+        
+        print("\n--- Test 2: Unknown Topic ---")
+        print(f"Final Answer: {asyncio.run(rag.query('Tell me about java'))}")
+
+        print("\n--- Test 3: Batch ---")
+        print(asyncio.run(rag.batch_query(["What is rust?", "Tell me about python", "java?"])))
@@ -13,14 +13,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from basics.input_validation import InputValidator
 from basics.output_validation import OutputValidator
-from intermediate.toxic_content_detection import ToxicDetector
-from intermediate.pii_detection import PIIDetector
+from intermediate.toxic_content_detection import get_toxic_detector
+from intermediate.pii_detection import get_pii_detector
 
 class SafeChatbot:
     def __init__(self):
         self.input_validator = InputValidator(max_length=200)
-        self.toxic_detector = ToxicDetector()
-        self.pii_detector = PIIDetector()
+        self.toxic_detector = get_toxic_detector()
+        self.pii_detector = get_pii_detector()
         self.output_validator = OutputValidator(max_length=500)
 
     def generate_response(self, user_input: str) -> str:
@@ -0,0 +1 @@
+from ._cache import ResultCache, text_digest
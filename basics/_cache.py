@@ -0,0 +1,57 @@
+"""
+Result Cache
+============
+
+Small LRU cache for validation results, keyed by a digest of the validated
+text so long inputs are not kept alive as dictionary keys.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+def text_digest(text: str) -> bytes:
+    """Return a 128-bit BLAKE2b digest of ``text``."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class ResultCache:
+    """Least-recently-used map from (text digest, *options) to a result.
+
+    Safe to share between threads: a lookup followed by ``move_to_end`` is
+    not atomic on its own, so every access to the map holds ``_lock``.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, text: str, *options: Hashable, digest: Optional[bytes] = None) -> Tuple[Hashable, ...]:
+        # Callers that already hold text_digest(text) pass it to skip rehashing
+        return (digest or text_digest(text),) + options
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        with self._lock:
+            result = self._data.get(key)
+            if result is not None:
+                self._data.move_to_end(key)
+            return result
+
+    def put(self, key: Tuple[Hashable, ...], result: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
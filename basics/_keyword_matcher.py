@@ -0,0 +1,104 @@
+"""
+Keyword Matcher
+===============
+
+Shared multi-keyword matcher for the regex-based filters. Patterns of the
+form ``\\b(?:word1|word2)\\b`` are really just whole-word keyword lists, so
+they are matched with a single Aho–Corasick pass (``pyahocorasick``) instead
+of the regex engine. Anything that is not a plain keyword list stays a regex.
+"""
+
+import re
+from typing import Iterator, List, Optional, Sequence, Tuple
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+from ._regex import compile_pattern
+
+# \bword\b or \b(?:w1|w2|...)\b with plain word characters only
+_KEYWORD_PATTERN = re.compile(r"^\\b(?:\((?:\?:)?)?(\w+(?:\|\w+)*)\)?\\b$")
+
+
+def split_keyword_patterns(patterns: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """Split patterns into (lowercased whole-word keywords, remaining regexes)."""
+    words: List[str] = []
+    regexes: List[str] = []
+    for pat in patterns:
+        m = _KEYWORD_PATTERN.match(pat)
+        grouped = pat.startswith(r"\b(")
+        # An ungrouped "\bfoo|bar\b" means "\bfoo" or "bar\b", so keep it a regex
+        if m and grouped == pat.endswith(r")\b") and (grouped or "|" not in pat):
+            words.extend(w.lower() for w in m.group(1).split("|"))
+        else:
+            regexes.append(pat)
+    return words, regexes
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Case-insensitive whole-word matcher over a fixed keyword list."""
+
+    def __init__(self, words: Sequence[str]):
+        self.words = [w.lower() for w in words]
+        self._automaton = None
+        self._regex: Optional[re.Pattern] = None
+        if ahocorasick and self.words:
+            self._automaton = ahocorasick.Automaton()
+            for w in self.words:
+                self._automaton.add_word(w, len(w))
+            self._automaton.make_automaton()
+        if self.words:
+            # Used when pyahocorasick is missing, and for non-ASCII text:
+            # re's case-insensitive matching folds e.g. 'ſ' to 's' and the Kelvin
+            # sign to 'k', and lowercasing 'İ' changes the text length,
+            # none of which a lowered-text automaton reproduces
+            self._regex = compile_pattern(
+                r"\b(?:" + "|".join(map(re.escape, self.words)) + r")\b", re.IGNORECASE
+            )
+
+    def _hits(self, low: str) -> Iterator[Tuple[int, int]]:
+        # Automaton hits (in end order) that sit on word boundaries
+        n = len(low)
+        for end, length in self._automaton.iter(low):
+            start = end - length + 1
+            if start > 0 and _is_word_char(low[start - 1]):
+                continue
+            if end + 1 < n and _is_word_char(low[end + 1]):
+                continue
+            yield start, end + 1
+
+    def search(self, text: str) -> bool:
+        """Return True if any keyword occurs as a whole word."""
+        if self._regex is None:
+            return False
+        if self._automaton is None or not text.isascii():
+            return self._regex.search(text) is not None
+        return next(self._hits(text.lower()), None) is not None
+
+    def sub(self, repl: str, text: str) -> str:
+        """Replace every whole-word keyword occurrence with ``repl``."""
+        if self._regex is None:
+            return text
+        if self._automaton is None or not text.isascii():
+            return self._regex.sub(repl, text)
+        low = text.lower()
+
+        # Leftmost, then longest, non-overlapping spans
+        spans = sorted(self._hits(low), key=lambda s: (s[0], -s[1]))
+        parts = []
+        pos = 0
+        for start, end in spans:
+            if start < pos:
+                continue
+            parts.append(text[pos:start])
+            parts.append(repl)
+            pos = end
+        if not parts:
+            return text
+        parts.append(text[pos:])
+        return "".join(parts)
@@ -0,0 +1,137 @@
+"""
+Regex Compilation
+=================
+
+Compile guardrail patterns with RE2 (``google-re2``) when it is installed.
+RE2 matches in time linear in the input, so adversarial text cannot trigger
+catastrophic backtracking. Patterns RE2 rejects (backreferences, lookaround)
+and environments without it fall back to Python's ``re``.
+
+RE2's ``\\w``, ``\\d`` and ``\\s`` are ASCII-only while ``re``'s are
+Unicode-aware, so they are rewritten as the equivalent Unicode classes before
+compiling with RE2 (otherwise e.g. ``on\\w+\\s*=`` would miss ``onclické=``).
+``\\b`` and ``\\B`` have no Unicode-aware RE2 equivalent, so patterns using
+them stay on ``re``.
+"""
+
+import re
+from typing import List, Optional, Sequence
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Class bodies matching what ``re`` means by \d, \w and \s in str patterns
+_UNICODE_CLASSES = {
+    "d": r"\p{Nd}",
+    "w": r"\pL\pN_",
+    "s": r"\t-\r\x{1c}-\x{20}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}",
+}
+
+
+def to_re2(pattern: str) -> Optional[str]:
+    """Rewrite ``pattern`` so RE2 matches the same text as ``re``, or return None.
+
+    ``\\d``/``\\w``/``\\s`` and their negations become Unicode classes.
+    Returns None for constructs without an RE2 equivalent: ``\\b``/``\\B``,
+    ``\\D``/``\\W``/``\\S`` inside a character class, ``$`` and ``{,n}``.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    class_start = None  # index just past the opening [ (and ^) when in a class
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < n:
+            nxt = pattern[i + 1]
+            if nxt in "bB":
+                return None
+            body = _UNICODE_CLASSES.get(nxt.lower())
+            if body is None:
+                out.append(pattern[i:i + 2])
+            elif class_start is not None:
+                if nxt.isupper():
+                    return None
+                out.append(body)
+            else:
+                out.append(f"[^{body}]" if nxt.isupper() else f"[{body}]")
+            i += 2
+            continue
+        if class_start is None:
+            # re's $ also matches before a trailing newline and x{,n} means
+            # x{0,n}; RE2 has neither meaning
+            if ch == "$" or pattern.startswith("{,", i):
+                return None
+            if ch == "[":
+                class_start = i + 2 if pattern.startswith("[^", i) else i + 1
+                out.append(pattern[i:class_start])
+                i = class_start
+                continue
+        elif ch == "]" and i > class_start:
+            # A ] right after [ or [^ is a literal
+            class_start = None
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def fusable(pattern: str) -> bool:
+    """Return True if ``pattern`` can be embedded in a fused alternation as is.
+
+    Patterns with global inline flags (``(?i)...``) fail to compile once
+    wrapped, and patterns with their own groups would be renumbered, which
+    breaks backreferences; both are kept as separate regexes by callers.
+    """
+    try:
+        return re.compile(f"(?:{pattern})").groups == 0
+    except re.error:
+        return False
+
+
+def _re2_options():
+    options = re2.Options()
+    # Rejected patterns fall back to ``re``; do not log them to stderr
+    options.log_errors = False
+    return options
+
+
+def compile_pattern(pattern: str, flags: int = 0):
+    """Compile ``pattern`` with RE2 if it matches the same text, otherwise with ``re``.
+
+    Only ``re.IGNORECASE`` and ``re.DOTALL`` are translated for RE2 (as
+    inline flags); other flags force the ``re`` fallback.
+    """
+    translated = to_re2(pattern) if re2 is not None else None
+    if translated is not None and not flags & ~(re.IGNORECASE | re.DOTALL):
+        inline = ("i" if flags & re.IGNORECASE else "") + ("s" if flags & re.DOTALL else "")
+        try:
+            return re2.compile(f"(?{inline}){translated}" if inline else translated, _re2_options())
+        except Exception:
+            pass
+    return re.compile(pattern, flags)
+
+
+class FusedPatterns:
+    """Patterns searched as one alternation, plus any that cannot be fused.
+
+    Patterns that are not ``fusable`` keep their own compiled regex and are
+    searched (or substituted) one by one after the fused one.
+    """
+
+    def __init__(self, patterns: Sequence[str], flags: int = 0):
+        fused = [p for p in patterns if fusable(p)]
+        self.combined = compile_pattern("|".join(f"(?:{p})" for p in fused), flags) if fused else None
+        self.separate: List = [compile_pattern(p, flags) for p in patterns if not fusable(p)]
+
+    def search(self, text: str):
+        """Return the first match found by any pattern, or None."""
+        m = self.combined.search(text) if self.combined is not None else None
+        if m is None:
+            m = next((m for m in (c.search(text) for c in self.separate) if m), None)
+        return m
+
+    def sub(self, repl: str, text: str) -> str:
+        if self.combined is not None:
+            text = self.combined.sub(repl, text)
+        for compiled in self.separate:
+            text = compiled.sub(repl, text)
+        return text
@@ -7,6 +7,9 @@ import re
 from enum import Enum
 from typing import List, Optional
 
+from ._regex import FusedPatterns
+from ._keyword_matcher import KeywordMatcher, split_keyword_patterns
+
 class FilterResult(Enum):
     CLEAN = "clean"
     BLOCKED = "blocked"
@@ -24,12 +27,17 @@ class ContentFilter:
             r"\b(?:terrorist|kill|murder|rape)\b",
         ]
         self.patterns = self.default_patterns + (custom_patterns or [])
+        # Whole-word keyword lists go to one Aho–Corasick pass; anything else
+        # is fused into a single alternation regex (except patterns with
+        # inline flags or groups, which are searched separately)
+        words, regexes = split_keyword_patterns(self.patterns)
+        self._keywords = KeywordMatcher(words)
+        self._regexes = FusedPatterns(regexes, re.IGNORECASE)
 
     def check(self, text: str) -> FilterResult:
         """Return ``BLOCKED`` if any pattern matches, otherwise ``CLEAN``."""
-        for pat in self.patterns:
-            if re.search(pat, text, re.IGNORECASE):
-                return FilterResult.BLOCKED
+        if self._keywords.search(text) or self._regexes.search(text):
+            return FilterResult.BLOCKED
         return FilterResult.CLEAN
 
     def filter(self, text: str) -> str:
@@ -38,10 +46,8 @@ class ContentFilter:
         This method is useful when you want to keep the text but mask
         the offending parts.
         """
-        sanitized = text
-        for pat in self.patterns:
-            sanitized = re.sub(pat, "***", sanitized, flags=re.IGNORECASE)
-        return sanitized
+        sanitized = self._keywords.sub("***", text)
+        return self._regexes.sub("***", sanitized)
 
 # ---------------------------------------------------------------------------
 # Example usage
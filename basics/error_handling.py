@@ -6,7 +6,10 @@ Provides a custom exception hierarchy and helper to format error messages.
 
 class GuardrailError(Exception):
     """Base class for all guardrail‑related errors."""
-    pass
+
+    def format(self) -> str:
+        """Return a human‑readable string for this error."""
+        return f"{type(self).__name__}: {self}"
 
 class ValidationError(GuardrailError):
     """Raised when input or output validation fails."""
@@ -14,16 +17,18 @@ class ValidationError(GuardrailError):
         super().__init__(message)
         self.errors = errors or []
 
+    def format(self) -> str:
+        if self.errors:
+            return f"ValidationError: {self} ({', '.join(self.errors)})"
+        return f"ValidationError: {self}"
+
 class RateLimitError(GuardrailError):
     """Raised when a rate‑limit is exceeded."""
     pass
 
 def format_error(err: GuardrailError) -> str:
     """Return a human‑readable string for the given guardrail error."""
-    if isinstance(err, ValidationError):
-        details = ", ".join(err.errors) if err.errors else ""
-        return f"ValidationError: {err} ({details})"
-    return f"{err.__class__.__name__}: {err}"
+    return err.format()
 
 # Example usage
 if __name__ == "__main__":
@@ -14,9 +14,16 @@ Key Concepts:
 """
 
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ._cache import ResultCache
+from ._regex import compile_pattern, fusable
 
 
 class ValidationResult(Enum):
@@ -26,17 +33,100 @@ class ValidationResult(Enum):
     SANITIZED = "sanitized"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ValidationResponse:
-    """Response object for validation results"""
+    """Response object for validation results (immutable, so safe to share)"""
     status: ValidationResult
     message: str
     sanitized_input: Optional[str] = None
-    errors: List[str] = None
+    errors: Tuple[str, ...] = ()
     
     def __post_init__(self):
-        if self.errors is None:
-            self.errors = []
+        # frozen=True is shallow, so errors is stored as a tuple too
+        if not isinstance(self.errors, tuple):
+            object.__setattr__(self, "errors", tuple(self.errors or ()))
+
+
+# Reused for every passing sub-check instead of allocating a new response
+_LENGTH_OK = ValidationResponse(ValidationResult.VALID, "Length validation passed")
+_NO_FORMAT_RESTRICTIONS = ValidationResponse(ValidationResult.VALID, "No format restrictions")
+_FORMAT_OK = ValidationResponse(ValidationResult.VALID, "Format validation passed")
+_NO_FORBIDDEN = ValidationResponse(ValidationResult.VALID, "No forbidden patterns detected")
+
+
+# Sanitization patterns are fixed, so compile them once at import
+_SCRIPT_BLOCK_RE = compile_pattern(r'<script.*?</script>', re.DOTALL | re.IGNORECASE)
+_EVENT_HANDLER_RE = compile_pattern(r'on\w+\s*=\s*["\'].*?["\']', re.IGNORECASE)
+_HTML_TAG_RE = compile_pattern(r'<[^>]+>')
+
+
+def _strip_markup(text: str) -> str:
+    """Remove script blocks, event handlers and tags, leaving entities escaped."""
+    if '<' not in text:
+        # No markup, so only handler-like text can need stripping
+        return _EVENT_HANDLER_RE.sub('', text)
+
+    # Regex passes rather than an HTML parser: serializing parsed text would
+    # decode entities (``&lt;iframe&gt;`` back into live markup) and an
+    # unclosed '<' would swallow the rest of the input
+
+    # Remove script content first (before tags are stripped)
+    text = _SCRIPT_BLOCK_RE.sub('', text)
+
+    # Remove event handlers
+    text = _EVENT_HANDLER_RE.sub('', text)
+
+    # Remove remaining HTML tags
+    return _HTML_TAG_RE.sub('', text)
+
+
+# ^[...]+$ / ^[...]*$ with literals, ranges and \s \d \w only
+_SIMPLE_CLASS_RE = re.compile(r'^\^\[((?:[^\\\]^]|\\.)(?:[^\\\]]|\\.)*)\]([+*])\$$')
+_CLASS_ESCAPES = {
+    's': str.isspace,
+    'd': str.isdecimal,
+    'w': lambda c: c.isalnum() or c == '_',
+}
+
+
+def _parse_char_class(pattern: str):
+    """
+    Turn a simple ``^[...]+$`` pattern into (chars, predicates, allow_empty).
+    
+    Returns None for anything else, which keeps the regex path.
+    """
+    m = _SIMPLE_CLASS_RE.match(pattern)
+    if not m:
+        return None
+    body, quantifier = m.groups()
+    chars = set()
+    predicates = []
+    i = 0
+    while i < len(body):
+        ch = body[i]
+        if ch == '\\':
+            esc = body[i + 1]
+            if i + 3 < len(body) and body[i + 2] == '-':
+                return None  # range with an escaped start, e.g. [\.-z]
+            if esc in _CLASS_ESCAPES:
+                predicates.append(_CLASS_ESCAPES[esc])
+            elif esc.isalnum():
+                return None  # \b, \S, \x41 and friends
+            else:
+                chars.add(esc)
+            i += 2
+        elif i + 2 < len(body) and body[i + 1] == '-':
+            if body[i + 2] == '\\':
+                return None  # range with an escaped end, e.g. [!-\]]
+            lo, hi = ord(ch), ord(body[i + 2])
+            if lo > hi:
+                return None
+            chars.update(map(chr, range(lo, hi + 1)))
+            i += 3
+        else:
+            chars.add(ch)
+            i += 1
+    return frozenset(chars), tuple(predicates), quantifier == '*'
 
 
 class InputValidator:
@@ -52,7 +142,8 @@ class InputValidator:
         max_length: int = 1000,
         min_length: int = 1,
         allowed_chars: Optional[str] = None,
-        forbidden_patterns: Optional[List[str]] = None
+        forbidden_patterns: Optional[List[str]] = None,
+        cache_size: int = 4096
     ):
         """
         Initialize the input validator.
@@ -62,6 +153,7 @@ class InputValidator:
             min_length: Minimum required input length
             allowed_chars: Regex pattern of allowed characters
             forbidden_patterns: List of forbidden regex patterns
+            cache_size: Number of ``validate`` results to memoize (0 disables)
         """
         self.max_length = max_length
         self.min_length = min_length
@@ -70,12 +162,49 @@ class InputValidator:
         
         # Default forbidden patterns (common injection attempts)
         self.default_forbidden_patterns = [
-            r'<script.*?>.*?</script>',  # Script tags
-            r'javascript:',               # JavaScript protocol
-            r'on\w+\s*=',                # Event handlers
-            r'eval\s*\(',                # Eval function
-            r'exec\s*\(',                # Exec function
+            r'<script[^>]*>.*?</script>',  # Script tags
+            r'javascript:',                 # JavaScript protocol
+            r'on\w+\s*=',                  # Event handlers
+            r'eval\s*\(',                  # Eval function
+            r'exec\s*\(',                  # Exec function
         ]
+        self._compile_patterns()
+        self._cache = ResultCache(cache_size)
+
+    # Reassigning any of these recompiles the patterns and drops cached results
+    _CONFIG_ATTRS = frozenset({
+        "max_length", "min_length", "allowed_chars",
+        "forbidden_patterns", "default_forbidden_patterns",
+    })
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self._CONFIG_ATTRS and "_cache" in self.__dict__:
+            self._compile_patterns()
+            self._cache.clear()
+
+    def clear_cache(self) -> None:
+        """Drop memoized results, e.g. after mutating a pattern list in place."""
+        self._compile_patterns()
+        self._cache.clear()
+
+    def _compile_patterns(self) -> None:
+        """Compile format and forbidden patterns once, outside the hot path."""
+        self._format_re = compile_pattern(self.allowed_chars) if self.allowed_chars else None
+        self._format_class = _parse_char_class(self.allowed_chars) if self.allowed_chars else None
+        all_patterns = self.default_forbidden_patterns + self.forbidden_patterns
+        self._forbidden = [(pattern, compile_pattern(pattern, re.IGNORECASE)) for pattern in all_patterns]
+        # Single-pass screen; the named group of a hit identifies its pattern,
+        # and the per-pattern list is only used to report the remaining ones.
+        # Patterns with global inline flags or their own groups cannot be
+        # wrapped (compile error / renumbered backreferences), so they are
+        # searched separately
+        fused = [i for i, p in enumerate(all_patterns) if fusable(p)]
+        self._forbidden_separate = [i for i in range(len(all_patterns)) if i not in fused]
+        self._forbidden_combined = compile_pattern(
+            "|".join(f"(?P<_fp{i}>{all_patterns[i]})" for i in fused), re.IGNORECASE
+        ) if fused else None
+        self._forbidden_groups = {f"_fp{i}": i for i in fused}
     
     def validate_length(self, text: str) -> ValidationResponse:
         """
@@ -101,10 +230,7 @@ class InputValidator:
                 errors=[f"Length {len(text)} > {self.max_length}"]
             )
         
-        return ValidationResponse(
-            status=ValidationResult.VALID,
-            message="Length validation passed"
-        )
+        return _LENGTH_OK
     
     def validate_format(self, text: str) -> ValidationResponse:
         """
@@ -117,39 +243,62 @@ class InputValidator:
             ValidationResponse with validation result
         """
         if self.allowed_chars is None:
-            return ValidationResponse(
-                status=ValidationResult.VALID,
-                message="No format restrictions"
-            )
+            return _NO_FORMAT_RESTRICTIONS
         
-        if not re.match(self.allowed_chars, text):
+        if self._format_class is not None:
+            matched = self._matches_class(text)
+        else:
+            matched = self._format_re.match(text) is not None
+        if not matched:
             return ValidationResponse(
                 status=ValidationResult.INVALID,
                 message="Input contains invalid characters",
                 errors=["Format validation failed"]
             )
         
-        return ValidationResponse(
-            status=ValidationResult.VALID,
-            message="Format validation passed"
-        )
+        return _FORMAT_OK
+    
+    def _matches_class(self, text: str) -> bool:
+        """Set-difference equivalent of matching a simple character class."""
+        chars, predicates, allow_empty = self._format_class
+
+        def in_class(s: str) -> bool:
+            if not s:
+                return allow_empty
+            return all(any(p(c) for p in predicates) for c in set(s) - chars)
+
+        # Like re's '$', also accept a single trailing newline
+        return in_class(text) or (text.endswith('\n') and in_class(text[:-1]))
     
-    def check_forbidden_patterns(self, text: str) -> ValidationResponse:
+    def check_forbidden_patterns(self, text: str, fast: bool = False) -> ValidationResponse:
         """
         Check for forbidden patterns in input.
         
         Args:
             text: Input text to check
+            fast: Report only the first hit in the text instead of every
+                pattern, so the combined scan is the only pass
             
         Returns:
             ValidationResponse with validation result
         """
-        all_patterns = self.default_forbidden_patterns + self.forbidden_patterns
-        errors = []
+        m = self._forbidden_combined.search(text) if self._forbidden_combined else None
+        if m:
+            hit = self._forbidden_groups[m.lastgroup]
+        else:
+            hit = next((i for i in self._forbidden_separate if self._forbidden[i][1].search(text)), None)
+            if hit is None:
+                return _NO_FORBIDDEN
         
-        for pattern in all_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                errors.append(f"Forbidden pattern detected: {pattern}")
+        if fast:
+            errors = [f"Forbidden pattern detected: {self._forbidden[hit][0]}"]
+        else:
+            # The pattern that produced the hit is known to match already
+            errors = [
+                f"Forbidden pattern detected: {pattern}"
+                for i, (pattern, compiled) in enumerate(self._forbidden)
+                if i == hit or compiled.search(text)
+            ]
         
         if errors:
             return ValidationResponse(
@@ -158,10 +307,7 @@ class InputValidator:
                 errors=errors
             )
         
-        return ValidationResponse(
-            status=ValidationResult.VALID,
-            message="No forbidden patterns detected"
-        )
+        return _NO_FORBIDDEN
     
     def sanitize_input(self, text: str) -> ValidationResponse:
         """
@@ -173,16 +319,7 @@ class InputValidator:
         Returns:
             ValidationResponse with sanitized input
         """
-        sanitized = text
-        
-        # Remove script content first (before tags are stripped)
-        sanitized = re.sub(r'<script.*?</script>', '', sanitized, flags=re.DOTALL | re.IGNORECASE)
-        
-        # Remove event handlers
-        sanitized = re.sub(r'on\w+\s*=\s*["\'].*?["\']', '', sanitized, flags=re.IGNORECASE)
-        
-        # Remove remaining HTML tags
-        sanitized = re.sub(r'<[^>]+>', '', sanitized)
+        sanitized = _strip_markup(text)
         
         # Normalize whitespace
         sanitized = ' '.join(sanitized.split())
@@ -203,7 +340,7 @@ class InputValidator:
             sanitized_input=sanitized
         )
     
-    def validate(self, text: str, sanitize: bool = True) -> ValidationResponse:
+    def validate(self, text: Optional[str], sanitize: bool = True) -> ValidationResponse:
         """
         Perform complete validation on input.
         
@@ -217,17 +354,55 @@ class InputValidator:
         # Check if input is None or empty
         if text is None:
             return ValidationResponse(ValidationResult.INVALID, "Input cannot be None", errors=["None input"])
+
+        # Repeated prompts skip every regex pass
+        key = self._cache.key(text, sanitize)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._validate_uncached(text, sanitize)
+            self._cache.put(key, result)
+        return result
+
+    def validate_batch(self, texts: List[Optional[str]], sanitize: bool = True) -> List[ValidationResponse]:
+        """
+        Validate many inputs, rejecting out-of-bounds lengths in one pass.
+        
+        Args:
+            texts: Input texts to validate
+            sanitize: Whether to sanitize the inputs
             
+        Returns:
+            One ValidationResponse per input, in order
+        """
+        lengths = [len(t) if t is not None else -1 for t in texts]
+        if np is not None:
+            lengths = np.asarray(lengths, dtype=np.int64)
+            in_bounds = ((lengths >= self.min_length) & (lengths <= self.max_length)).tolist()
+        else:
+            in_bounds = [self.min_length <= n <= self.max_length for n in lengths]
+
+        # Only survivors reach sanitization and the pattern checks
+        return [
+            self.validate(text, sanitize) if ok or text is None else self.validate_length(text)
+            for text, ok in zip(texts, in_bounds)
+        ]
+
+    def _validate_uncached(self, text: str, sanitize: bool) -> ValidationResponse:
+        # Length first, so oversized input is rejected before any regex work
+        length_res = self.validate_length(text)
+        if length_res.status == ValidationResult.INVALID:
+            return length_res
+
         is_sanitized = False
         if sanitize:
             san_res = self.sanitize_input(text)
             if san_res.status == ValidationResult.SANITIZED:
                 is_sanitized = True
-            text = san_res.sanitized_input or text
-            
-        length_res = self.validate_length(text)
-        if length_res.status == ValidationResult.INVALID:
-            return length_res
+                text = san_res.sanitized_input or text
+                # Sanitizing only shrinks the text, so re-check the minimum
+                length_res = self.validate_length(text)
+                if length_res.status == ValidationResult.INVALID:
+                    return length_res
             
         format_res = self.validate_format(text)
         if format_res.status == ValidationResult.INVALID:
@@ -271,6 +446,16 @@ class URLValidator(InputValidator):
             ]
         )
 
+    def validate_format(self, text: str) -> ValidationResponse:
+        # Cheap scheme check before the regex
+        if not text.startswith(('https://', 'http://')):
+            return ValidationResponse(
+                status=ValidationResult.INVALID,
+                message="Input contains invalid characters",
+                errors=["Format validation failed"]
+            )
+        return super().validate_format(text)
+
 
 # ============================================================================
 # USAGE EXAMPLES
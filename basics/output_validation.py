@@ -10,25 +10,46 @@ Checks include:
 
 import json
 import re
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ._cache import ResultCache
+from ._regex import FusedPatterns, compile_pattern
+from ._keyword_matcher import KeywordMatcher, split_keyword_patterns
 
 class OutputStatus(Enum):
     VALID = "valid"
     INVALID = "invalid"
     SANITIZED = "sanitized"
 
+@dataclass(slots=True, frozen=True, repr=False)
 class OutputResponse:
-    def __init__(self, status: OutputStatus, message: str, sanitized_output: Optional[str] = None, errors: Optional[List[str]] = None):
-        self.status = status
-        self.message = message
-        self.sanitized_output = sanitized_output
-        self.errors = errors or []
+    """Immutable, since validate() hands cached instances to every caller."""
+    status: OutputStatus
+    message: str
+    sanitized_output: Optional[str] = None
+    errors: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        if not isinstance(self.errors, tuple):
+            object.__setattr__(self, "errors", tuple(self.errors or ()))
+
     def __repr__(self):
         return f"OutputResponse(status={self.status}, message={self.message})"
 
 class OutputValidator:
-    def __init__(self, max_length: int = 2000, min_length: int = 1, json_schema: Optional[Dict[str, Any]] = None, forbidden_patterns: Optional[List[str]] = None):
+    # Reassigning any of these recompiles the patterns and drops cached results
+    _CONFIG_ATTRS = frozenset({
+        "max_length", "min_length", "json_schema",
+        "forbidden_patterns", "default_forbidden_patterns",
+    })
+
+    def __init__(self, max_length: int = 2000, min_length: int = 1, json_schema: Optional[Dict[str, Any]] = None, forbidden_patterns: Optional[List[str]] = None, cache_size: int = 4096):
         self.max_length = max_length
         self.min_length = min_length
         self.json_schema = json_schema
@@ -37,6 +58,32 @@ class OutputValidator:
             r"\b(?:fuck|shit|bitch|cunt)\b",
             r"\b(?:terrorist|kill|murder)\b",
         ]
+        self._compile_patterns()
+        self._cache = ResultCache(cache_size)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self._CONFIG_ATTRS and "_cache" in self.__dict__:
+            self._compile_patterns()
+            self._cache.clear()
+
+    def clear_cache(self) -> None:
+        """Drop memoized results, e.g. after mutating a pattern list in place."""
+        self._compile_patterns()
+        self._cache.clear()
+
+    def _compile_patterns(self) -> None:
+        """Compile forbidden patterns once, outside the hot path."""
+        all_patterns = self.default_forbidden_patterns + self.forbidden_patterns
+        self._forbidden = [(pat, compile_pattern(pat, re.IGNORECASE)) for pat in all_patterns]
+        # Single-pass screen (keywords via Aho–Corasick, the fusable rest as
+        # one regex); the per-pattern list is only used to report hits
+        words, regexes = split_keyword_patterns(all_patterns)
+        self._forbidden_keywords = KeywordMatcher(words)
+        self._forbidden_regexes = FusedPatterns(regexes, re.IGNORECASE)
+        words, regexes = split_keyword_patterns(self.default_forbidden_patterns)
+        self._default_keywords = KeywordMatcher(words)
+        self._default_regexes = FusedPatterns(regexes, re.IGNORECASE)
 
     def _check_length(self, text: str) -> OutputResponse:
         if len(text) < self.min_length:
@@ -49,7 +96,8 @@ class OutputValidator:
         if not self.json_schema:
             return OutputResponse(OutputStatus.VALID, "No schema required")
         try:
-            data = json.loads(text)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            data = orjson.loads(text) if orjson else json.loads(text)
         except json.JSONDecodeError as e:
             return OutputResponse(OutputStatus.INVALID, "Invalid JSON", errors=[str(e)])
         required = self.json_schema.get("required", [])
@@ -59,19 +107,16 @@ class OutputValidator:
         return OutputResponse(OutputStatus.VALID, "JSON schema OK")
 
     def _check_forbidden(self, text: str) -> OutputResponse:
-        patterns = self.default_forbidden_patterns + self.forbidden_patterns
-        hits = []
-        for pat in patterns:
-            if re.search(pat, text, re.IGNORECASE):
-                hits.append(pat)
+        if not self._forbidden_keywords.search(text) and not self._forbidden_regexes.search(text):
+            return OutputResponse(OutputStatus.VALID, "No forbidden content")
+        hits = [pat for pat, compiled in self._forbidden if compiled.search(text)]
         if hits:
             return OutputResponse(OutputStatus.INVALID, "Forbidden content", errors=hits)
         return OutputResponse(OutputStatus.VALID, "No forbidden content")
 
     def sanitize(self, text: str) -> OutputResponse:
-        sanitized = text
-        for pat in self.default_forbidden_patterns:
-            sanitized = re.sub(pat, "***", sanitized, flags=re.IGNORECASE)
+        sanitized = self._default_keywords.sub("***", text)
+        sanitized = self._default_regexes.sub("***", sanitized)
         if len(sanitized) > self.max_length:
             sanitized = sanitized[:self.max_length]
             
@@ -80,6 +125,15 @@ class OutputValidator:
         return OutputResponse(OutputStatus.VALID, "No sanitization needed", sanitized_output=text)
 
     def validate(self, text: str, sanitize: bool = True) -> OutputResponse:
+        # Repeated outputs skip every check
+        key = self._cache.key(text, sanitize)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._validate_uncached(text, sanitize)
+            self._cache.put(key, result)
+        return result
+
+    def _validate_uncached(self, text: str, sanitize: bool) -> OutputResponse:
         # Length first
         length_res = self._check_length(text)
         if length_res.status == OutputStatus.INVALID:
@@ -93,7 +147,10 @@ class OutputValidator:
         if json_res.status == OutputStatus.INVALID:
             return json_res
         if sanitize:
-            return self.sanitize(text)
+            # The default patterns are a subset of those _check_forbidden just
+            # cleared, and the length is in bounds, so sanitize() would return
+            # the text unchanged; skip its extra scans and copy
+            return OutputResponse(OutputStatus.VALID, "No sanitization needed", sanitized_output=text)
         return OutputResponse(OutputStatus.VALID, "All checks passed")
 
 # Example usage
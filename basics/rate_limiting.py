@@ -6,41 +6,132 @@ Simple in‑memory rate limiter to protect LLM calls from abuse.
 """
 
 import time
-from collections import defaultdict
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Callable, Any
 
+@lru_cache(maxsize=1)
+def _load_bucket_kernel():
+    """Import numba and compile the bucket kernel on first use.
+
+    Kept out of module import so plain ``RateLimiter`` users never load
+    numba. Returns ``(numpy, kernel)``.
+    """
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        raise ImportError("JitRateLimiter requires numba: pip install numba") from None
+
+    @njit(cache=True)
+    def _bucket_step(state, now, rate, cap):
+        # state is a float64 array of (tokens, last_refill); updated in place
+        tokens = min(cap, state[0] + (now - state[1]) * rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        state[0] = tokens
+        state[1] = now
+        return allowed
+
+    # Compile now so the first real request doesn't pay for it
+    _bucket_step(np.array([1.0, 0.0]), 0.0, 1.0, 1.0)
+    return np, _bucket_step
+
 class RateLimiter:
-    """Token‑bucket style rate limiter.
+    """Token‑bucket rate limiter.
     
     * ``max_calls`` – maximum number of calls allowed in ``period`` seconds.
     * ``period`` – time window in seconds.
+
+    * ``max_keys`` – number of keys tracked before the least recently
+      used one is evicted.
+
+    Each key holds a bucket of ``max_calls`` tokens that refills at
+    ``max_calls / period`` tokens per second, so only two floats are stored
+    per key regardless of traffic. Keys are only stored once they record a
+    call; an evicted key starts again with a full bucket.
     """
-    def __init__(self, max_calls: int = 10, period: int = 60):
+    def __init__(self, max_calls: int = 10, period: int = 60, max_keys: int = 10_000):
+        if max_calls <= 0:
+            raise ValueError("max_calls must be positive")
+        if period <= 0:
+            raise ValueError("period must be positive")
         self.max_calls = max_calls
         self.period = period
-        self.calls: defaultdict[str, list[float]] = defaultdict(list)
+        self.max_keys = max_keys
+        self.capacity = float(max_calls)
+        self.rate = max_calls / period
+        # key -> (tokens, last_refill), least recently used first
+        self.state: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def _refill(self, key: str, now: float) -> float:
+        # Return the token count for ``key`` after topping up for elapsed time
+        entry = self.state.get(key)
+        if entry is None:
+            return self.capacity
+        tokens, last_refill = entry
+        return min(self.capacity, tokens + (now - last_refill) * self.rate)
 
-    def _prune(self, key: str, now: float) -> None:
-        # Remove timestamps older than the period
-        self.calls[key] = [t for t in self.calls[key] if now - t < self.period]
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        self.state[key] = (tokens, now)
+        self.state.move_to_end(key)
+        if len(self.state) > self.max_keys:
+            self.state.popitem(last=False)
 
     def allow(self, key: str = "default") -> bool:
-        now = time.time()
-        self._prune(key, now)
-        return len(self.calls[key]) < self.max_calls
+        return self._refill(key, time.monotonic()) >= 1
 
     def record(self, key: str = "default") -> None:
-        now = time.time()
-        self._prune(key, now)
-        self.calls[key].append(now)
+        now = time.monotonic()
+        self._store(key, self._refill(key, now) - 1, now)
+
+    def limit(self, func: Callable) -> Callable:
+        """Decorator that enforces the rate limit before calling ``func``.
+        """
+        def wrapper(*args, **kwargs):
+            now = time.monotonic()
+            tokens = self._refill("default", now)
+            if tokens < 1:
+                raise RuntimeError("Rate limit exceeded")
+            self._store("default", tokens - 1, now)
+            return func(*args, **kwargs)
+        return wrapper
+
+class JitRateLimiter(RateLimiter):
+    """Token-bucket limiter whose per-call math runs in a Numba kernel.
+
+    Only worthwhile when the limiter itself is the bottleneck (very high QPS
+    in a single process). Requires ``numba``; per-key state is stored as a
+    two-element float64 array so the kernel can update it in place.
+    """
+    def __init__(self, max_calls: int = 10, period: int = 60, max_keys: int = 10_000):
+        self._np, self._bucket_step = _load_bucket_kernel()
+        super().__init__(max_calls, period, max_keys)
+
+    def _bucket(self, key: str, now: float):
+        state = self.state.get(key)
+        if state is None:
+            state = self._np.array([self.capacity, now])
+            self.state[key] = state
+            if len(self.state) > self.max_keys:
+                self.state.popitem(last=False)
+        else:
+            self.state.move_to_end(key)
+        return state
+
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        state = self._bucket(key, now)
+        state[0] = tokens
+        state[1] = now
 
     def limit(self, func: Callable) -> Callable:
         """Decorator that enforces the rate limit before calling ``func``.
         """
         def wrapper(*args, **kwargs):
-            if not self.allow():
+            now = time.monotonic()
+            if not self._bucket_step(self._bucket("default", now), now, self.rate, self.capacity):
                 raise RuntimeError("Rate limit exceeded")
-            self.record()
             return func(*args, **kwargs)
         return wrapper
 
@@ -5,23 +5,55 @@ OpenAI Integration
 Wrapper around OpenAI API to apply guardrails before and after calls.
 """
 
+import asyncio
+import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 
 # Mock import if openai not installed
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI, OpenAI
 except ImportError:
     OpenAI = None
 
+# Terminal states of an OpenAI Batch API job
+_BATCH_DONE = {"completed", "failed", "expired", "cancelled"}
+
 class GuardedOpenAI:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, max_retries: int = 5):
         if OpenAI:
-            self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+            api_key = api_key or os.getenv("OPENAI_API_KEY")
+            # Both clients are built once so their connection pools (and TLS
+            # sessions) are reused; they retry 429/5xx with exponential backoff
+            self.client = OpenAI(api_key=api_key, max_retries=max_retries)
+            self.aclient = AsyncOpenAI(api_key=api_key, max_retries=max_retries)
         else:
             self.client = None
+            self.aclient = None
             print("OpenAI library not installed.")
 
+    @staticmethod
+    def _first_failure(content: str, validators: List[Any] = None) -> Optional[str]:
+        """Return the message of the first failing validator, if any."""
+        for validator in validators or ():
+            # Assuming validator has a .validate(text) method
+            res = validator.validate(content)
+            if hasattr(res, 'is_valid') and not res.is_valid:
+                return res.message
+        return None
+
+    @classmethod
+    def _validate_output(cls, content: str, validators: List[Any] = None) -> str:
+        # 3. Output Validation (Post-flight)
+        print(">> Validating output...")
+        failure = cls._first_failure(content, validators)
+        if failure is not None:
+            print(f"Validation failed: {failure}")
+            # Handle failure (retry, fix, raise)
+            return f"[BLOCKED] {failure}"
+        
+        return content
+
     def chat_completion(self, messages: List[Dict[str, str]], validators: List[Any] = None, **kwargs):
         if not self.client:
             return "OpenAI client not initialized."
@@ -37,18 +69,141 @@ class GuardedOpenAI:
         )
         content = response.choices[0].message.content
 
-        # 3. Output Validation (Post-flight)
-        print(">> Validating output...")
-        if validators:
-            for validator in validators:
-                # Assuming validator has a .validate(text) method
-                res = validator.validate(content)
-                if hasattr(res, 'is_valid') and not res.is_valid:
-                    print(f"Validation failed: {res.message}")
-                    # Handle failure (retry, fix, raise)
-                    return f"[BLOCKED] {res.message}"
-        
-        return content
+        return self._validate_output(content, validators)
+
+    def stream_chat_completion(self, messages: List[Dict[str, str]], validators: List[Any] = None,
+                               check_every: int = 200, overlap: int = 256,
+                               window_validators: List[Any] = None, **kwargs):
+        """
+        Stream the completion and validate it while it is being generated.
+
+        Every ``check_every`` new characters the window validators (default:
+        ``validators``) see the newly streamed text plus ``overlap`` characters
+        before it (enough for any pattern up to that length to straddle the
+        boundary). The first failure closes the stream, so no further tokens
+        are generated. These windowed checks only abort early: once the stream
+        ends, every validator runs on the full completion. Pass content checks
+        only as ``window_validators`` when ``validators`` include whole-output
+        checks (length limits, JSON schemas) that fail on fragments.
+        """
+        if not self.client:
+            return "OpenAI client not initialized."
+
+        if window_validators is None:
+            window_validators = validators
+        print(">> Validating inputs...")
+        stream = self.client.chat.completions.create(messages=messages, stream=True, **kwargs)
+        parts: List[str] = []
+        fresh: List[str] = []  # streamed but not yet validated
+        fresh_len = 0
+        tail = ""  # last `overlap` characters already validated
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    fresh.append(delta)
+                    fresh_len += len(delta)
+                if fresh and (fresh_len >= check_every or (chunk.choices and chunk.choices[0].finish_reason)):
+                    window = tail + "".join(fresh)
+                    failure = self._first_failure(window, window_validators)
+                    if failure is not None:
+                        print(f"Validation failed: {failure}")
+                        return f"[BLOCKED] {failure}"
+                    tail = window[-overlap:] if overlap > 0 else ""
+                    fresh, fresh_len = [], 0
+        finally:
+            stream.close()
+
+        return self._validate_output("".join(parts), validators)
+
+    async def achat_completion(self, messages: List[Dict[str, str]], validators: List[Any] = None, **kwargs):
+        """Async ``chat_completion``; the event loop stays free during the request."""
+        if not self.aclient:
+            return "OpenAI client not initialized."
+
+        print(">> Validating inputs...")
+        response = await self.aclient.chat.completions.create(
+            messages=messages,
+            **kwargs
+        )
+        return self._validate_output(response.choices[0].message.content, validators)
+
+    async def batch_chat_completions(
+        self,
+        batch: List[List[Dict[str, str]]],
+        validators: List[Any] = None,
+        max_concurrency: int = 8,
+        use_batch_api: bool = False,
+        **kwargs
+    ) -> List[str]:
+        """
+        Run many conversations, returning validated outputs in input order.
+
+        Requests are fanned out concurrently (at most ``max_concurrency`` in
+        flight). With ``use_batch_api=True`` they are submitted as a single
+        OpenAI Batch API job instead: half the token cost, but results can
+        take up to 24h; requests the job could not complete come back as
+        ``"[FAILED] <error>"`` instead of being validated.
+        """
+        if not self.aclient:
+            return ["OpenAI client not initialized."] * len(batch)
+        if use_batch_api:
+            contents = await self._run_batch_job(batch, **kwargs)
+            return [
+                f"[FAILED] {c}" if isinstance(c, Exception) else self._validate_output(c, validators)
+                for c in contents
+            ]
+
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(messages):
+            async with sem:
+                return await self.achat_completion(messages, validators, **kwargs)
+
+        return await asyncio.gather(*(bounded(m) for m in batch))
+
+    async def _run_batch_job(self, batch: List[List[Dict[str, str]]], poll_interval: float = 30.0,
+                             **kwargs) -> List[Union[str, Exception]]:
+        """Run ``batch`` as one Batch API job; failed requests yield a ``RuntimeError``."""
+        lines = [
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"messages": messages, **kwargs},
+            })
+            for i, messages in enumerate(batch)
+        ]
+        input_file = await self.aclient.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        job = await self.aclient.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        while job.status not in _BATCH_DONE:
+            await asyncio.sleep(poll_interval)
+            job = await self.aclient.batches.retrieve(job.id)
+        if job.status != "completed" or not job.output_file_id:
+            raise RuntimeError(f"Batch {job.id} ended with status {job.status}")
+
+        output = await self.aclient.files.content(job.output_file_id)
+        contents: List[Union[str, Exception]] = [
+            RuntimeError(f"Request {i} missing from batch {job.id} output") for i in range(len(batch))
+        ]
+        for line in output.text.splitlines():
+            record = json.loads(line)
+            i = int(record["custom_id"])
+            body = (record.get("response") or {}).get("body") or {}
+            error = record.get("error") or body.get("error")
+            if error:
+                message = error.get("message", error) if isinstance(error, dict) else error
+                contents[i] = RuntimeError(f"Request {i} failed: {message}")
+            elif body.get("choices"):
+                contents[i] = body["choices"][0]["message"]["content"]
+        return contents
 
 if __name__ == "__main__":
     # Mock validator for demonstration
@@ -68,6 +223,7 @@ if __name__ == "__main__":
             # This will likely fail without a real key, but shows the structure
             # output = wrapper.chat_completion(msgs, validators=[MockValidator()], model="gpt-3.5-turbo")
             # print(output)
+            # outputs = asyncio.run(wrapper.batch_chat_completions([msgs] * 10, [MockValidator()], model="gpt-3.5-turbo"))
             print("OpenAI wrapper initialized. Set OPENAI_API_KEY to run real calls.")
         except Exception as e:
             print(f"Setup error: {e}")
@@ -5,8 +5,96 @@ Context Management Guardrails
 Utilities for managing context windows, token limits, and conversation history.
 """
 
-from typing import List, Dict, Any, Optional
-import tiktoken
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import accumulate
+from typing import List, Dict, Any, Optional, Union
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from basics import ResultCache, text_digest
+
+# Histories are re-counted on every turn, so each string is tokenized once
+_token_counts = ResultCache(maxsize=4096)
+# Fewer uncached strings than this are encoded one by one
+_MIN_BATCH = 8
+
+def _count_tokens_batch(encoding: "tiktoken.Encoding", texts: List[str]) -> List[int]:
+    """Token counts for ``texts``; uncached strings are encoded in one batch call."""
+    keys = [_token_counts.key(text, encoding.name) for text in texts]
+    counts = [_token_counts.get(key) for key in keys]
+    missing = {}
+    for key, text, count in zip(keys, texts, counts):
+        if count is None:
+            missing.setdefault(key, text)
+    if missing:
+        # Chat text is user content, so special-token scanning is skipped.
+        # The batch API spins up a thread pool per call, which only pays off
+        # for larger batches
+        texts_to_encode = list(missing.values())
+        if len(texts_to_encode) < _MIN_BATCH:
+            encoded = map(encoding.encode_ordinary, texts_to_encode)
+        else:
+            encoded = encoding.encode_ordinary_batch(texts_to_encode)
+        fresh = dict(zip(missing, map(len, encoded)))
+        for key, count in fresh.items():
+            _token_counts.put(key, count)
+        counts = [fresh[key] if count is None else count for key, count in zip(keys, counts)]
+    return counts
+
+@lru_cache(maxsize=8)
+def _encoding_for(model_name: str) -> "tiktoken.Encoding":
+    """One shared, thread-safe Encoding per model across all managers."""
+    if tiktoken is None:
+        # A word-count estimate would undercount BPE tokens and let trimmed
+        # histories overflow the real context window
+        raise ImportError("ContextManager requires tiktoken: pip install tiktoken")
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+class MessageStore:
+    """
+    Conversation history as parallel arrays instead of a list of dicts.
+
+    ``tokens[i]`` holds the token count of ``roles[i]`` plus ``contents[i]``,
+    filled in once by ``ContextManager.append``, so counting and trimming
+    only read the integer array. ``digests[i]`` is ``text_digest(contents[i])``
+    for cache lookups that would otherwise rehash the message.
+    """
+    __slots__ = ("roles", "contents", "tokens", "digests")
+
+    def __init__(self):
+        self.roles: List[str] = []
+        self.contents: List[str] = []
+        self.tokens = array("i")
+        self.digests: List[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    def append(self, role: str, content: str, tokens: int, digest: Optional[bytes] = None) -> None:
+        self.roles.append(role)
+        self.contents.append(content)
+        self.tokens.append(tokens)
+        self.digests.append(digest or text_digest(content))
+
+    def without(self, start: int, stop: int) -> "MessageStore":
+        """Return a copy with messages ``start:stop`` removed."""
+        store = MessageStore()
+        store.roles = self.roles[:start] + self.roles[stop:]
+        store.contents = self.contents[:start] + self.contents[stop:]
+        store.tokens = self.tokens[:start] + self.tokens[stop:]
+        store.digests = self.digests[:start] + self.digests[stop:]
+        return store
+
+    def to_messages(self) -> List[Dict[str, str]]:
+        """Chat-API message dicts, e.g. for the final request."""
+        return [{"role": role, "content": content} for role, content in zip(self.roles, self.contents)]
 
 class ContextManager:
     """
@@ -16,28 +104,49 @@ class ContextManager:
         self.model_name = model_name
         self.max_tokens = max_tokens
         self.safety_margin = safety_margin
-        try:
-            self.encoding = tiktoken.encoding_for_model(model_name)
-        except KeyError:
-            self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.encoding = _encoding_for(model_name)
 
     def count_tokens(self, text: str) -> int:
         """Count tokens in a text string."""
-        return len(self.encoding.encode(text))
+        return _count_tokens_batch(self.encoding, [text])[0]
 
-    def count_message_tokens(self, messages: List[Dict[str, str]]) -> int:
-        """Count tokens in a list of messages (simplified estimation)."""
-        num_tokens = 0
+    def _message_tokens(self, messages: List[Dict[str, str]]) -> List[int]:
+        # One tokenizer call for every value of every message
+        value_counts = iter(_count_tokens_batch(self.encoding, [v for m in messages for v in m.values()]))
+        counts = []
         for message in messages:
-            num_tokens += 4  # Every message follows <im_start>{role/name}\n{content}<im_end>\n
-            for key, value in message.items():
-                num_tokens += self.count_tokens(value)
+            num_tokens = 4  # Every message follows <im_start>{role/name}\n{content}<im_end>\n
+            for key in message:
+                num_tokens += next(value_counts)
                 if key == "name":  # if there's a name, the role is omitted
                     num_tokens += -1  # role is always required and always 1 token
+            counts.append(num_tokens)
+        return counts
+
+    def append(self, store: MessageStore, role: str, content: str, digest: Optional[bytes] = None) -> None:
+        """Append a message to ``store``, counting its tokens once."""
+        store.append(role, content, sum(_count_tokens_batch(self.encoding, [role, content])), digest)
+
+    def to_store(self, messages: List[Dict[str, str]]) -> MessageStore:
+        """Convert role/content message dicts, tokenizing them in one batch."""
+        store = MessageStore()
+        roles = [m.get("role", "") for m in messages]
+        contents = [m.get("content", "") for m in messages]
+        counts = _count_tokens_batch(self.encoding, roles + contents)
+        for role, content, role_tokens, content_tokens in zip(roles, contents, counts, counts[len(roles):]):
+            store.append(role, content, role_tokens + content_tokens)
+        return store
+
+    def count_message_tokens(self, messages: Union[List[Dict[str, str]], MessageStore]) -> int:
+        """Count tokens in a list of messages (simplified estimation)."""
+        if isinstance(messages, MessageStore):
+            return sum(messages.tokens) + 4 * len(messages) + 2
+        num_tokens = sum(self._message_tokens(messages))
         num_tokens += 2  # every reply is primed with <im_start>assistant
         return num_tokens
 
-    def trim_context(self, messages: List[Dict[str, str]], new_message: str = "") -> List[Dict[str, str]]:
+    def trim_context(self, messages: Union[List[Dict[str, str]], MessageStore],
+                     new_message: str = "") -> Union[List[Dict[str, str]], MessageStore]:
         """
         Trim the message history to fit within the context window, preserving the system message if present.
         """
@@ -45,24 +154,27 @@ class ContextManager:
         if available_tokens < 0:
             raise ValueError("New message is too long for the context window.")
 
-        current_tokens = self.count_message_tokens(messages)
+        is_store = isinstance(messages, MessageStore)
+        counts = [t + 4 for t in messages.tokens] if is_store else self._message_tokens(messages)
+        current_tokens = sum(counts) + 2
         if current_tokens <= available_tokens:
             return messages
 
         # Preserve system message if it exists at the beginning
-        system_message = None
-        if messages and messages[0].get("role") == "system":
-            system_message = messages[0]
-            messages = messages[1:]
+        if is_store:
+            first_role = messages.roles[0] if len(messages) else None
+        else:
+            first_role = messages[0].get("role") if messages else None
+        keep = 1 if first_role == "system" else 0
 
-        # Remove oldest messages until it fits
-        while messages and self.count_message_tokens([system_message] + messages if system_message else messages) > available_tokens:
-            messages.pop(0)
+        # Remove oldest messages until it fits: the first cut whose dropped
+        # tokens cover the excess, found by bisecting the running totals
+        dropped = list(accumulate(counts[keep:]))
+        cut = keep + min(bisect_left(dropped, current_tokens - available_tokens) + 1, len(dropped))
 
-        if system_message:
-            messages.insert(0, system_message)
-
-        return messages
+        if is_store:
+            return messages.without(keep, cut)
+        return messages[:keep] + messages[cut:]
 
 if __name__ == "__main__":
     cm = ContextManager(max_tokens=100)
@@ -76,3 +188,8 @@ if __name__ == "__main__":
     trimmed = cm.trim_context(msgs, new_message="And then?")
     print(f"Trimmed tokens: {cm.count_message_tokens(trimmed)}")
     print(f"Trimmed messages: {trimmed}")
+
+    # Same history as parallel arrays: counts are read, never recomputed
+    store = cm.to_store(msgs)
+    print(f"Store tokens: {cm.count_message_tokens(store)}")
+    print(f"Trimmed store: {cm.trim_context(store, new_message='And then?').to_messages()}")
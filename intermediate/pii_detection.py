@@ -7,6 +7,9 @@ Detects personal identifiable information (PII) such as email addresses, phone n
 
 import re
 from enum import Enum
+from functools import lru_cache
+
+from basics._regex import compile_pattern
 
 class PIIResult(Enum):
     CLEAN = "clean"
@@ -15,20 +18,65 @@ class PIIResult(Enum):
 class PIIDetector:
     def __init__(self):
         self.patterns = {
-            "email": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}",
-            "phone": r"\\b\\d{3}[-.]?\\d{3}[-.]?\\d{4}\\b",
-            "ssn": r"\\b\\d{3}-\\d{2}-\\d{4}\\b",
+            "email": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+            "phone": r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b",
+            "ssn": r"\b\d{3}-\d{2}-\d{4}\b",
         }
-    def check(self, text: str) -> PIIResult:
+        self._compile()
+
+    def _compile(self):
+        # One named-group alternation per regex engine: a single scan finds any
+        # PII kind of that group and lastgroup says which one matched. Kinds
+        # RE2 can run exactly (e.g. email) get a linear-time scan; the \b kinds
+        # stay on re, whose word boundaries are Unicode-aware
+        groups = {}
         for name, pat in self.patterns.items():
-            if re.search(pat, text):
-                return PIIResult.FOUND
+            on_re = isinstance(compile_pattern(pat), re.Pattern)
+            groups.setdefault(on_re, []).append(f"(?P<{name}>{pat})")
+        self._scans = [compile_pattern("|".join(parts)) for parts in groups.values()]
+        self._order = {name: i for i, name in enumerate(self.patterns)}
+
+    def _matches(self, text: str):
+        # Leftmost match across the scans, ties going to the kind listed first,
+        # exactly as one alternation over every pattern would find them
+        pending = [scan.search(text) for scan in self._scans]
+        pos = 0
+        while True:
+            for i, m in enumerate(pending):
+                if m is not None and m.start() < pos:
+                    pending[i] = self._scans[i].search(text, pos)
+            live = [m for m in pending if m is not None]
+            if not live:
+                return
+            m = min(live, key=lambda m: (m.start(), self._order[m.lastgroup]))
+            yield m
+            pos = m.end() if m.end() > m.start() else m.end() + 1
+
+    def check(self, text: str) -> PIIResult:
+        if any(scan.search(text) for scan in self._scans):
+            return PIIResult.FOUND
         return PIIResult.CLEAN
+
     def redact(self, text: str) -> str:
-        redacted = text
-        for name, pat in self.patterns.items():
-            redacted = re.sub(pat, f"<REDACTED_{name.upper()}>", redacted)
-        return redacted
+        parts = []
+        pos = 0
+        for m in self._matches(text):
+            parts.append(text[pos:m.start()])
+            parts.append(f"<REDACTED_{m.lastgroup.upper()}>")
+            pos = m.end()
+        if not parts:
+            return text
+        parts.append(text[pos:])
+        return "".join(parts)
+
+@lru_cache(maxsize=1)
+def get_pii_detector() -> PIIDetector:
+    """Return a process-wide ``PIIDetector``.
+
+    The detector holds no per-call state, so one instance can be shared by
+    every agent/bot (and across threads).
+    """
+    return PIIDetector()
 
 if __name__ == "__main__":
     detector = PIIDetector()
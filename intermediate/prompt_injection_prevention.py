@@ -8,10 +8,25 @@ Detects and mitigates attempts to inject malicious instructions into prompts.
 import re
 from enum import Enum
 
+from basics._regex import fusable
+
 class InjectionResult(Enum):
     SAFE = "safe"
     BLOCKED = "blocked"
 
+def _literal_prefix(pattern: str) -> str:
+    """Return the lowercase literal text a pattern must start with ('' if none)."""
+    if "|" in pattern:
+        return ""
+    m = re.match(r"[A-Za-z0-9 ]+", pattern)
+    if not m:
+        return ""
+    prefix = m.group(0)
+    # A trailing quantifier makes the last literal character optional
+    if pattern[m.end():m.end() + 1] in ("?", "*", "{"):
+        prefix = prefix[:-1]
+    return prefix.lower()
+
 class PromptInjectionGuard:
     """Simple heuristic‑based injection detection.
     
@@ -26,11 +41,34 @@ class PromptInjectionGuard:
             r"act\s+as\s+if\s+you\s+are",
         ]
         self.patterns = self.default_patterns + (custom_patterns or [])
+        self._compile()
+
+    def _compile(self) -> None:
+        # Patterns are fused into one alternation so a prompt is scanned once;
+        # ones that cannot be embedded (global inline flags, own groups) are
+        # searched separately
+        fused = [p for p in self.patterns if fusable(p)]
+        self._re = re.compile("|".join(f"(?:{p})" for p in fused), re.IGNORECASE) if fused else None
+        self._separate = [re.compile(p, re.IGNORECASE) for p in self.patterns if not fusable(p)]
+        # Literal keywords every match must contain; None disables the prefilter
+        anchors = [_literal_prefix(p) for p in self.patterns]
+        self._anchors = tuple(anchors) if all(anchors) else None
+
+    def add_pattern(self, pattern: str) -> None:
+        """Register an extra injection pattern and rebuild the compiled union."""
+        self.patterns.append(pattern)
+        self._compile()
 
     def check(self, prompt: str) -> InjectionResult:
-        for pat in self.patterns:
-            if re.search(pat, prompt, re.IGNORECASE):
-                return InjectionResult.BLOCKED
+        # Cheap substring prefilter: most prompts contain none of the anchors.
+        # ASCII only: the regex's case-insensitive matching also folds e.g.
+        # 'İ' to 'i' and 'ſ' to 's', which lower() + ``in`` would miss
+        if self._anchors is not None and prompt.isascii():
+            low = prompt.lower()
+            if not any(a in low for a in self._anchors):
+                return InjectionResult.SAFE
+        if (self._re and self._re.search(prompt)) or any(r.search(prompt) for r in self._separate):
+            return InjectionResult.BLOCKED
         return InjectionResult.SAFE
 
 if __name__ == "__main__":
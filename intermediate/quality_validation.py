@@ -27,6 +27,8 @@ class QualityValidator:
         self.uncertainty_markers = [
             "I don't know", "I am not sure", "I cannot answer", "As an AI language model"
         ]
+        # All markers in one alternation, matched against lowercased text
+        self._uncertainty_re = re.compile("|".join(re.escape(m.lower()) for m in self.uncertainty_markers))
 
     def check_length(self, text: str) -> bool:
         words = text.split()
@@ -34,24 +36,27 @@ class QualityValidator:
 
     def check_repetition(self, text: str) -> bool:
         """Check if the text is overly repetitive."""
-        words = text.lower().split()
+        return self._repetition_ok(text.lower().split())
+
+    def _repetition_ok(self, words: List[str]) -> bool:
         if not words:
             return True
+        # set() hashes each word once in C; hashing into a NumPy array for
+        # np.unique (or a Numba loop) measured ~3x slower at 500 words
         unique_words = set(words)
         ratio = len(unique_words) / len(words)
         return ratio >= (1.0 - self.max_repetition_ratio)
 
     def check_uncertainty(self, text: str) -> bool:
         """Check if the response indicates refusal or uncertainty."""
-        for marker in self.uncertainty_markers:
-            if marker.lower() in text.lower():
-                return False
-        return True
+        return self._uncertainty_re.search(text.lower()) is None
 
     def validate(self, text: str) -> QualityResult:
-        if not self.check_length(text):
+        # Lowercase and split once; lowercasing never changes the word count
+        words = text.lower().split()
+        if len(words) < self.min_words:
             return QualityResult.FAIL
-        if not self.check_repetition(text):
+        if not self._repetition_ok(words):
             return QualityResult.FAIL
         # Uncertainty check is optional depending on use case, here we just flag it
         # but don't necessarily fail validation unless strict mode is desired.
@@ -8,6 +8,10 @@ In production you would replace this with a model‑based classifier.
 
 import re
 from enum import Enum
+from functools import lru_cache
+
+from basics._keyword_matcher import KeywordMatcher, split_keyword_patterns
+from basics._regex import FusedPatterns
 
 class ToxicResult(Enum):
     CLEAN = "clean"
@@ -22,18 +26,31 @@ class ToxicDetector:
             r"\b(?:hate|racist|bigot)\b",
         ]
         self.patterns = self.default_patterns + (custom_patterns or [])
+        # Whole-word keyword lists go to one Aho–Corasick pass; true regexes
+        # (usually custom patterns) are fused into a small second pass, run by
+        # RE2 when available so hostile input cannot force backtracking.
+        # Patterns with inline flags or groups are searched separately
+        words, regexes = split_keyword_patterns(self.patterns)
+        self._keywords = KeywordMatcher(words)
+        self._regexes = FusedPatterns(regexes, re.IGNORECASE)
 
     def check(self, text: str) -> ToxicResult:
-        for pat in self.patterns:
-            if re.search(pat, text, re.IGNORECASE):
-                return ToxicResult.TOXIC
+        if self._keywords.search(text) or self._regexes.search(text):
+            return ToxicResult.TOXIC
         return ToxicResult.CLEAN
 
     def sanitize(self, text: str) -> str:
-        sanitized = text
-        for pat in self.patterns:
-            sanitized = re.sub(pat, "***", sanitized, flags=re.IGNORECASE)
-        return sanitized
+        sanitized = self._keywords.sub("***", text)
+        return self._regexes.sub("***", sanitized)
+
+@lru_cache(maxsize=1)
+def get_toxic_detector() -> ToxicDetector:
+    """Return a process-wide ``ToxicDetector`` with the default patterns.
+
+    The detector holds no per-call state, so one instance can be shared by
+    every agent/bot (and across threads).
+    """
+    return ToxicDetector()
 
 if __name__ == "__main__":
     detector = ToxicDetector()
@@ -6,9 +6,23 @@ Utilities to encourage the model to "think step-by-step" before answering.
 This often improves reasoning and adherence to guardrails.
 """
 
+import re
+from typing import Sequence
+
 class CoTPromptWrapper:
-    def __init__(self, trigger_phrase: str = "Let's think step by step."):
+    def __init__(self, trigger_phrase: str = "Let's think step by step.",
+                 answer_markers: Sequence[str] = ("Therefore,", "Final answer:", "Answer:")):
         self.trigger_phrase = trigger_phrase
+        self.answer_markers = tuple(answer_markers)
+        # Longest marker first so "Final answer:" wins over "Answer:". Markers
+        # match in any case but only at a word start, so "Final Answer:" is
+        # one marker and "Reanswer:" is none
+        self._boundary = re.compile(
+            r"(?<!\w)(?:"
+            + "|".join(map(re.escape, sorted(self.answer_markers, key=len, reverse=True)))
+            + ")",
+            re.IGNORECASE
+        )
 
     def wrap(self, prompt: str) -> str:
         """
@@ -21,16 +35,19 @@ class CoTPromptWrapper:
         Attempt to separate reasoning from the final answer.
         This is a heuristic and depends on how the model structures its output.
         """
-        # Simple heuristic: assume the answer comes after "Therefore," or similar
+        # Simple heuristic: assume the answer comes after the last "Therefore,",
+        # "Final answer:" or "Answer:" marker.
         # In practice, you might ask the model to output in a specific format like:
         # Reasoning: ...
         # Answer: ...
         
-        parts = response.split("Therefore,")
-        if len(parts) > 1:
+        last = None
+        for last in self._boundary.finditer(response):
+            pass
+        if last:
             return {
-                "reasoning": parts[0].strip(),
-                "answer": parts[-1].strip()
+                "reasoning": response[:last.start()].strip(),
+                "answer": response[last.end():].strip()
             }
         return {"full_response": response}
 
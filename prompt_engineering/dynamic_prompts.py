@@ -5,34 +5,91 @@ Dynamic Prompts
 Construct prompts dynamically based on context, user history, or external data.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 class DynamicPromptBuilder:
     def __init__(self, base_instruction: str):
         self.base_instruction = base_instruction
-        self.context_items = []
+        # Persistent part (instruction + documents/few-shots) comes first so
+        # provider prefix caches can reuse it; history changes every turn
+        self.static_context: List[str] = []
+        self.dynamic_context: List[Dict[str, str]] = []
+
+    @property
+    def context_items(self) -> Tuple[str, ...]:
+        """
+        Read-only view of every context line: static items, then history.
+
+        Returned as a tuple so stray ``context_items.append(...)`` calls fail
+        loudly; use ``add_context``/``add_history`` instead.
+        """
+        return tuple(self.static_context) + tuple(self._format_turn(msg) for msg in self.dynamic_context)
+
+    @staticmethod
+    def _format_turn(msg: Dict[str, str]) -> str:
+        role = msg.get("role", "unknown")
+        content = msg.get("content", "")
+        return f"{role.capitalize()}: {content}"
 
     def add_context(self, item: str):
-        self.context_items.append(item)
+        """
+        Add a document or few-shot example to the static context.
+
+        Items are deduplicated: adding one that is already present is a
+        no-op, so re-retrieved documents do not change the cached prefix.
+        """
+        if item not in self.static_context:
+            self.static_context.append(item)
 
     def add_history(self, history: List[Dict[str, str]]):
-        # Format chat history as text
-        for msg in history:
-            role = msg.get("role", "unknown")
-            content = msg.get("content", "")
-            self.context_items.append(f"{role.capitalize()}: {content}")
+        # Also accepts a context_management.MessageStore (parallel role/content arrays)
+        if hasattr(history, "roles") and hasattr(history, "contents"):
+            history = [{"role": r, "content": c} for r, c in zip(history.roles, history.contents)]
+        self.dynamic_context.extend(history)
 
     def build(self, user_input: str) -> str:
-        prompt = f"{self.base_instruction}\n\n"
-        
-        if self.context_items:
-            prompt += "Context:\n"
-            for item in self.context_items:
-                prompt += f"- {item}\n"
-            prompt += "\n"
-            
-        prompt += f"User: {user_input}\nAssistant:"
-        return prompt
+        return "".join(self.build_parts(user_input))
+
+    def build_parts(self, user_input: str) -> Tuple[str, str]:
+        """
+        Split ``build()`` output into (cacheable prefix, per-turn suffix).
+
+        The prefix holds the instruction and static context only, so it is
+        identical across turns; history and the user turn go in the suffix.
+        """
+        prefix = [self.base_instruction, "\n\n"]
+        suffix = []
+        if self.static_context:
+            prefix.append("Context:\n")
+            prefix.extend(f"- {item}\n" for item in self.static_context)
+        elif self.dynamic_context:
+            suffix.append("Context:\n")
+        if self.static_context or self.dynamic_context:
+            suffix.extend(f"- {self._format_turn(msg)}\n" for msg in self.dynamic_context)
+            suffix.append("\n")
+        suffix.append(f"User: {user_input}\nAssistant:")
+        return "".join(prefix), "".join(suffix)
+
+    def build_messages(self, user_input: str) -> List[Dict[str, Any]]:
+        """
+        Build a chat message list with a cacheable prefix.
+
+        The system block (instruction + static context) is byte-identical
+        across calls and carries an Anthropic ``cache_control`` marker;
+        history and the new user turn follow it as ordinary messages.
+        """
+        persistent = self.base_instruction
+        if self.static_context:
+            persistent += "\n\nContext:\n" + "".join(f"- {item}\n" for item in self.static_context)
+        system = {
+            "role": "system",
+            "content": [{"type": "text", "text": persistent, "cache_control": {"type": "ephemeral"}}],
+        }
+        history = [
+            {"role": msg.get("role", "user"), "content": msg.get("content", "")}
+            for msg in self.dynamic_context
+        ]
+        return [system, *history, {"role": "user", "content": user_input}]
 
 if __name__ == "__main__":
     builder = DynamicPromptBuilder("You are a helpful assistant answering questions based on context.")
@@ -50,3 +107,7 @@ if __name__ == "__main__":
     
     final_prompt = builder.build("Where do I live?")
     print(final_prompt)
+
+    # Structured form for chat APIs with prompt caching
+    for message in builder.build_messages("Where do I live?"):
+        print(message)
@@ -6,7 +6,7 @@ Helper classes to construct few-shot prompts, which improve model performance
 and adherence to constraints by providing examples.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from dataclasses import dataclass
 
 @dataclass
@@ -16,15 +16,30 @@ class Example:
 
 class FewShotPromptBuilder:
     def __init__(self, instruction: str, examples: List[Example]):
-        self.instruction = instruction
-        self.examples = examples
+        self._instruction = instruction
+        self._examples = tuple(examples)
+        # The instruction + examples block never changes between calls
+        self._prefix = f"{instruction}\n\n" + "".join(self._format_example(ex) for ex in self._examples)
+
+    @property
+    def instruction(self) -> str:
+        return self._instruction
+
+    @property
+    def examples(self) -> Tuple[Example, ...]:
+        """Read-only; use ``add_example`` so the cached prefix stays in sync."""
+        return self._examples
+
+    @staticmethod
+    def _format_example(ex: Example) -> str:
+        return f"Input: {ex.input}\nOutput: {ex.output}\n\n"
+
+    def add_example(self, example: Example):
+        self._examples += (example,)
+        self._prefix += self._format_example(example)
 
     def build(self, new_input: str) -> str:
-        prompt = f"{self.instruction}\n\n"
-        for ex in self.examples:
-            prompt += f"Input: {ex.input}\nOutput: {ex.output}\n\n"
-        prompt += f"Input: {new_input}\nOutput:"
-        return prompt
+        return f"{self._prefix}Input: {new_input}\nOutput:"
 
 if __name__ == "__main__":
     # Example: Sentiment Analysis
@@ -6,53 +6,111 @@ Basic utilities for optimizing prompts via grid search over parameters.
 In a real scenario, you might use DSPy or similar libraries.
 """
 
-from typing import List, Dict, Callable, Any
+from concurrent.futures import Executor
+from typing import List, Dict, Callable, Any, Optional
+import asyncio
+import inspect
 import itertools
 
 class PromptOptimizer:
     def __init__(self, model_func: Callable[[str, float, float], str], evaluator: Callable[[str], float]):
         """
         :param model_func: Function that takes (prompt, temperature, top_p) and returns output string.
+                           May also be an ``async def`` for use with ``grid_search_async``.
         :param evaluator: Function that takes output string and returns a score (0.0 to 1.0).
         """
         self.model_func = model_func
         self.evaluator = evaluator
 
-    def grid_search(self, prompt_template: str, test_inputs: List[str], 
-                   temperatures: List[float], top_ps: List[float]) -> Dict[str, Any]:
-        
+    @staticmethod
+    def _summarize(params: List[tuple], total_scores: List[float], num_inputs: int) -> Dict[str, Any]:
         best_score = -1.0
         best_params = {}
         results = []
 
+        for (temp, top_p), total_score in zip(params, total_scores):
+            avg_score = total_score / num_inputs if num_inputs else 0
+            results.append({"temp": temp, "top_p": top_p, "score": avg_score})
+            
+            if avg_score > best_score:
+                best_score = avg_score
+                best_params = {"temp": temp, "top_p": top_p}
+                
+        return {
+            "best_params": best_params,
+            "best_score": best_score,
+            "all_results": results
+        }
+
+    @staticmethod
+    def _render_prompts(prompt_template: str, test_inputs: List[str]) -> List[str]:
+        # Split the template once; joining the pieces around each input is
+        # equivalent to replace() but never rescans the template
+        pieces = prompt_template.split("{input}")
+        return [inp.join(pieces) for inp in test_inputs]
+
+    def grid_search(self, prompt_template: str, test_inputs: List[str], 
+                   temperatures: List[float], top_ps: List[float]) -> Dict[str, Any]:
+        
         # Generate all combinations
         params = list(itertools.product(temperatures, top_ps))
+        prompts = self._render_prompts(prompt_template, test_inputs)
         
         print(f"Starting grid search with {len(params)} combinations...")
 
+        total_scores = []
         for temp, top_p in params:
             total_score = 0.0
-            for inp in test_inputs:
-                prompt = prompt_template.replace("{input}", inp)
+            for prompt in prompts:
                 try:
                     output = self.model_func(prompt, temp, top_p)
                     score = self.evaluator(output)
                     total_score += score
                 except Exception as e:
                     print(f"Error with temp={temp}, top_p={top_p}: {e}")
+            total_scores.append(total_score)
             
-            avg_score = total_score / len(test_inputs) if test_inputs else 0
-            results.append({"temp": temp, "top_p": top_p, "score": avg_score})
-            
-            if avg_score > best_score:
-                best_score = avg_score
-                best_params = {"temp": temp, "top_p": top_p}
-                
-        return {
-            "best_params": best_params,
-            "best_score": best_score,
-            "all_results": results
-        }
+        return self._summarize(params, total_scores, len(test_inputs))
+
+    async def grid_search_async(self, prompt_template: str, test_inputs: List[str],
+                                temperatures: List[float], top_ps: List[float],
+                                max_concurrency: int = 16,
+                                executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """
+        Same as ``grid_search``, but runs every (params, input) call concurrently.
+
+        An ``async`` model_func is awaited directly; a sync one runs in
+        ``executor`` (default thread pool; pass a ``ProcessPoolExecutor``
+        for CPU-bound local models, in which case model_func must be picklable).
+        At most ``max_concurrency`` calls are in flight.
+        """
+        params = list(itertools.product(temperatures, top_ps))
+        prompts = self._render_prompts(prompt_template, test_inputs)
+
+        print(f"Starting grid search with {len(params)} combinations...")
+
+        loop = asyncio.get_running_loop()
+        sem = asyncio.Semaphore(max_concurrency)
+        is_async = inspect.iscoroutinefunction(self.model_func)
+
+        async def score(prompt: str, temp: float, top_p: float) -> float:
+            async with sem:
+                try:
+                    if is_async:
+                        output = await self.model_func(prompt, temp, top_p)
+                    else:
+                        output = await loop.run_in_executor(executor, self.model_func, prompt, temp, top_p)
+                    return self.evaluator(output)
+                except Exception as e:
+                    print(f"Error with temp={temp}, top_p={top_p}: {e}")
+                    return 0.0
+
+        scores = await asyncio.gather(*(score(p, t, tp) for t, tp in params for p in prompts))
+
+        # Scores come back grouped by parameter combination, inputs in order
+        n = len(prompts)
+        total_scores = [sum(scores[i * n:(i + 1) * n]) for i in range(len(params))]
+        return self._summarize(params, total_scores, n)
 
 if __name__ == "__main__":
     # Mock model and evaluator
@@ -74,3 +132,6 @@ if __name__ == "__main__":
     
     result = optimizer.grid_search(template, inputs, temps, top_ps)
     print("Optimization Result:", result)
+
+    result = asyncio.run(optimizer.grid_search_async(template, inputs, temps, top_ps))
+    print("Async Optimization Result:", result)
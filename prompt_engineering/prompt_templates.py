@@ -7,14 +7,48 @@ Allows for separation of prompt structure from data.
 """
 
 from string import Template
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 class PromptTemplate:
     def __init__(self, template_str: str):
-        self.template = Template(template_str)
+        self._template_str = template_str
+        self._parts = self._parse(template_str)
+
+    @property
+    def template_str(self) -> str:
+        """The template text; read-only, since it is parsed once."""
+        return self._template_str
+
+    @staticmethod
+    def _parse(template_str: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Split the template once into (text, key) segments using the same
+        regex as ``string.Template``. ``key`` is None for literal text; for
+        placeholders ``text`` is the original ``$key``/``${key}`` so missing
+        keys are left untouched, as with ``safe_substitute``.
+        """
+        parts: List[Tuple[str, Optional[str]]] = []
+        pos = 0
+        for m in Template.pattern.finditer(template_str):
+            if m.start() > pos:
+                parts.append((template_str[pos:m.start()], None))
+            key = m.group("named") or m.group("braced")
+            if key is not None:
+                parts.append((m.group(), key))
+            elif m.group("escaped") is not None:
+                parts.append((Template.delimiter, None))
+            else:
+                parts.append((m.group(), None))
+            pos = m.end()
+        if pos < len(template_str):
+            parts.append((template_str[pos:], None))
+        return parts
 
     def format(self, **kwargs) -> str:
-        return self.template.safe_substitute(**kwargs)
+        return "".join(
+            text if key is None or key not in kwargs else str(kwargs[key])
+            for text, key in self._parts
+        )
 
 # Common templates
 SUMMARIZATION_TEMPLATE = """
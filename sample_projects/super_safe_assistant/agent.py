@@ -5,22 +5,67 @@ The core agent logic that uses the pipeline and simulates RAG + Generation.
 """
 
 import time
-from typing import List, Dict
+from functools import lru_cache
+from typing import Optional
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from .config import Config
 from .pipeline import GuardPipeline
+from basics._cache import text_digest
+from intermediate.context_management import ContextManager, MessageStore
+
+@lru_cache(maxsize=1)
+def _shared_context_manager() -> Optional[ContextManager]:
+    """One ContextManager per process; a failed tokenizer load is not retried."""
+    try:
+        return ContextManager(max_tokens=Config.MAX_CONTEXT_TOKENS)
+    except Exception:
+        print("Warning: Conversation history disabled (tiktoken or its encoding is unavailable).")
+        return None
 
 class SafeAgent:
     def __init__(self):
         self.pipeline = GuardPipeline()
-        self.history: List[Dict[str, str]] = []
+        self.history = MessageStore()
+        self.context_manager = _shared_context_manager()
+
+        # One automaton pass finds every knowledge-base key in a query
+        self._kb_keys = list(Config.KNOWLEDGE_BASE)
+        self._kb_index = None
+        if ahocorasick and self._kb_keys:
+            self._kb_index = ahocorasick.Automaton()
+            for idx, key in enumerate(self._kb_keys):
+                self._kb_index.add_word(key, idx)
+            self._kb_index.make_automaton()
         
+    def _append(self, role: str, content: str) -> bytes:
+        """Record a turn and return its digest.
+
+        Digest and token count are computed once here; the history is then
+        trimmed to ``Config.MAX_CONTEXT_TOKENS`` from the stored counts.
+        Without a tokenizer nothing is recorded, since it cannot be budgeted.
+        """
+        digest = text_digest(content)
+        if self.context_manager is not None:
+            self.context_manager.append(self.history, role, content, digest)
+            self.history = self.context_manager.trim_context(self.history)
+        return digest
+
     def retrieve_context(self, query: str) -> str:
         """Simulate RAG retrieval."""
         # Simple keyword matching against config knowledge base
-        relevant_docs = []
-        for key, content in Config.KNOWLEDGE_BASE.items():
-            if key in query.lower():
-                relevant_docs.append(content)
+        q = query.lower()
+        if self._kb_index is not None:
+            # Knowledge-base order, each document once
+            hits = sorted({idx for _, idx in self._kb_index.iter(q)})
+            relevant_docs = [Config.KNOWLEDGE_BASE[self._kb_keys[idx]] for idx in hits]
+        else:
+            # Substring test against the once-lowered query, like the
+            # automaton; a word-token index would miss keys inside words
+            relevant_docs = [content for key, content in Config.KNOWLEDGE_BASE.items() if key in q]
         
         if not relevant_docs:
             return ""
@@ -46,6 +91,7 @@ class SafeAgent:
             return f"[BLOCKED] {input_res.reason}"
         
         clean_query = input_res.text
+        query_digest = self._append("user", clean_query)
         
         # 2. Retrieval (RAG)
         context = self.retrieve_context(clean_query)
@@ -54,9 +100,12 @@ class SafeAgent:
         raw_response = self.generate_response(clean_query, context)
         
         # 4. Output Guardrails
-        output_res = self.pipeline.validate_output(raw_response, context=context, query=clean_query)
+        output_res = self.pipeline.validate_output(
+            raw_response, context=context, query=clean_query, query_digest=query_digest
+        )
         if output_res.is_blocked:
             # Fallback or error message
             return f"[BLOCKED] Response unsafe: {output_res.reason}"
-            
+
+        self._append("assistant", output_res.text)
         return output_res.text
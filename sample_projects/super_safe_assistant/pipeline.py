@@ -7,29 +7,110 @@ Orchestrates the execution of all guardrails.
 import sys
 import os
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set
 
 # Ensure project root is in path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from basics._cache import ResultCache, text_digest
+from basics._regex import compile_pattern, fusable
 from basics.input_validation import InputValidator, ValidationResult
 from basics.output_validation import OutputValidator, OutputStatus
-from intermediate.toxic_content_detection import ToxicDetector
+from intermediate.toxic_content_detection import ToxicDetector, ToxicResult
 from intermediate.pii_detection import PIIDetector
 from intermediate.prompt_injection_prevention import PromptInjectionGuard, InjectionResult
-from advanced.hallucination_detection import HallucinationDetector
-from advanced.semantic_validation import SemanticValidator
 from .config import Config
 
-@dataclass
+@dataclass(frozen=True)
 class PipelineResult:
     text: Optional[str]
     is_blocked: bool
     reason: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
+def _union(*parts):
+    return compile_pattern("|".join(parts))
+
+def _case_insensitive_group(name: str, patterns) -> Optional[str]:
+    fused = [p for p in patterns if fusable(p)]
+    if not fused:
+        return None
+    return f"(?P<{name}>(?i:" + "|".join(f"(?:{p})" for p in fused) + "))"
+
+class UnifiedScanner:
+    """
+    Injection, toxicity and PII detection in one regex pass.
+
+    The three detectors' patterns are merged into a single named-group
+    alternation, ``(?P<inj>...)|(?P<tox>...)|(?P<pii_email>...)|...``, so a
+    clean message (the common case) is scanned once instead of three times.
+    Custom patterns that cannot be embedded (global inline flags, own groups)
+    are left to the detector's own ``check()``.
+
+    The default toxic and PII patterns use ``\\b``, which RE2 cannot match
+    like ``re``, so with them the fused scan runs on ``re``.
+    """
+    def __init__(self, injection: PromptInjectionGuard, toxic: ToxicDetector, pii: PIIDetector):
+        inj = _case_insensitive_group("inj", injection.patterns)
+        tox = _case_insensitive_group("tox", toxic.patterns)
+        piis = [f"(?P<pii_{name}>{pat})" for name, pat in pii.patterns.items()]
+        self._all = _union(*[g for g in (inj, tox) if g], *piis)
+        self._inj = _union(inj) if inj else None
+        self._tox = _union(tox) if tox else None
+        # Detectors whose unfusable patterns the fused scan cannot see
+        self._injection = injection if not all(fusable(p) for p in injection.patterns) else None
+        self._toxic = toxic if not all(fusable(p) for p in toxic.patterns) else None
+
+    def _has_injection(self, text: str) -> bool:
+        if self._inj is not None and self._inj.search(text):
+            return True
+        return self._injection is not None and self._injection.check(text) == InjectionResult.BLOCKED
+
+    def has_toxic(self, text: str) -> bool:
+        """Toxicity alone, for callers that do not act on the other kinds."""
+        if self._tox is not None and self._tox.search(text):
+            return True
+        return self._toxic is not None and self._toxic.check(text) == ToxicResult.TOXIC
+
+    def scan(self, text: str) -> Dict[str, Any]:
+        """Return ``{"inj": bool, "tox": bool, "pii": set of PII kinds}``.
+
+        ``inj`` and ``tox`` are exact. ``pii`` only lists kinds found outside
+        injection/toxic spans, which is all a caller needs before redacting.
+        """
+        inj = tox = False
+        pii: Set[str] = set()
+        for m in self._all.finditer(text):
+            name = m.lastgroup
+            if name == "inj":
+                inj = True
+            elif name == "tox":
+                tox = True
+            else:
+                pii.add(name[4:])
+        if inj or tox or pii:
+            # Matches do not overlap, so any earlier span can hide a threat
+            # starting inside it; recheck the missing kinds alone
+            if not inj:
+                inj = self._has_injection(text)
+            if not tox:
+                tox = self.has_toxic(text)
+        else:
+            # Clean for the fused patterns; only unfusable ones remain
+            inj = self._injection is not None and self._has_injection(text)
+            tox = self._toxic is not None and self.has_toxic(text)
+        return {"inj": inj, "tox": tox, "pii": pii}
+
+# Marks an advanced guard that has not been loaded yet (None means disabled)
+_NOT_LOADED = object()
+
 class GuardPipeline:
-    def __init__(self):
+    def __init__(self, cache_size: int = 10_000):
+        # Every guard is deterministic, so verdicts (including blocks) are
+        # memoized by text digest; retries and repeated turns skip all scans
+        self._input_cache = ResultCache(cache_size)
+        self._output_cache = ResultCache(cache_size)
+
         # Input Guards
         self.input_validator = InputValidator(
             min_length=Config.MIN_INPUT_LENGTH, 
@@ -38,22 +119,61 @@ class GuardPipeline:
         self.toxic_detector = ToxicDetector()
         self.pii_detector = PIIDetector()
         self.injection_guard = PromptInjectionGuard()
+        self.scanner = UnifiedScanner(self.injection_guard, self.toxic_detector, self.pii_detector)
         
         # Output Guards
         self.output_validator = OutputValidator(max_length=Config.MAX_OUTPUT_LENGTH)
         
-        # Advanced Guards (fail gracefully if deps missing)
-        try:
-            self.hallucination_detector = HallucinationDetector()
-            self.semantic_validator = SemanticValidator(threshold=Config.SEMANTIC_SIMILARITY_THRESHOLD)
-        except:
-            self.hallucination_detector = None
-            self.semantic_validator = None
-            print("Warning: Advanced guardrails (Hallucination/Semantic) disabled due to missing dependencies.")
+        # Advanced Guards load their models on first use, so blocked inputs
+        # and short-lived pipelines never pay for them
+        self._hallucination_detector = _NOT_LOADED
+        self._semantic_validator = _NOT_LOADED
+
+    @property
+    def hallucination_detector(self):
+        if self._hallucination_detector is _NOT_LOADED:
+            # Fail gracefully if deps missing
+            try:
+                from advanced.hallucination_detection import HallucinationDetector
+                self._hallucination_detector = HallucinationDetector()
+            except Exception:
+                self._hallucination_detector = None
+                print("Warning: Hallucination guardrail disabled due to missing dependencies.")
+        return self._hallucination_detector
+
+    @hallucination_detector.setter
+    def hallucination_detector(self, detector) -> None:
+        self._hallucination_detector = detector
+
+    @property
+    def semantic_validator(self):
+        if self._semantic_validator is _NOT_LOADED:
+            try:
+                from advanced.semantic_validation import SemanticValidator
+                self._semantic_validator = SemanticValidator(threshold=Config.SEMANTIC_SIMILARITY_THRESHOLD)
+            except Exception:
+                self._semantic_validator = None
+                print("Warning: Semantic guardrail disabled due to missing dependencies.")
+        return self._semantic_validator
+
+    @semantic_validator.setter
+    def semantic_validator(self, validator) -> None:
+        self._semantic_validator = validator
 
     def validate_input(self, user_input: str) -> PipelineResult:
         """Run all input guardrails."""
-        
+        key = self._input_cache.key(user_input)
+        result = self._input_cache.get(key)
+        if result is None:
+            result = self._validate_input_uncached(user_input)
+            self._input_cache.put(key, result)
+        return result
+
+    def _validate_input_uncached(self, user_input: str) -> PipelineResult:
+        # Guards run cheapest first and the first block returns: the length
+        # check inside InputValidator precedes sanitization, and the single
+        # regex scan only sees text that passed both
+
         # 1. Basic Validation (Length, Format, Sanitization)
         val_res = self.input_validator.validate(user_input)
         if val_res.status == ValidationResult.INVALID:
@@ -61,23 +181,42 @@ class GuardPipeline:
         
         sanitized_input = val_res.sanitized_input or user_input
 
+        # 2-4. Injection, toxicity and PII share one scan
+        hits = self.scanner.scan(sanitized_input)
+
         # 2. Prompt Injection
-        if self.injection_guard.check(sanitized_input) == InjectionResult.BLOCKED:
+        if hits["inj"]:
             return PipelineResult(None, True, "Potential prompt injection detected.")
 
         # 3. Toxicity
-        if self.toxic_detector.check(sanitized_input).value == "toxic":
+        if hits["tox"]:
             return PipelineResult(None, True, "Toxic content detected.")
 
         # 4. PII (Redact instead of block)
-        if self.pii_detector.check(sanitized_input).value == "found":
+        if hits["pii"]:
             sanitized_input = self.pii_detector.redact(sanitized_input)
             
         return PipelineResult(sanitized_input, False)
 
-    def validate_output(self, generated_text: str, context: str = None, query: str = None) -> PipelineResult:
-        """Run all output guardrails."""
-        
+    def validate_output(self, generated_text: str, context: str = None, query: str = None,
+                        query_digest: Optional[bytes] = None) -> PipelineResult:
+        """Run all output guardrails.
+
+        ``query_digest`` may carry a precomputed ``text_digest(query)``, e.g.
+        from ``MessageStore.digests``.
+        """
+        key = self._output_cache.key(
+            generated_text,
+            text_digest(context) if context else None,
+            (query_digest or text_digest(query)) if query else None,
+        )
+        result = self._output_cache.get(key)
+        if result is None:
+            result = self._validate_output_uncached(generated_text, context, query)
+            self._output_cache.put(key, result)
+        return result
+
+    def _validate_output_uncached(self, generated_text: str, context: str = None, query: str = None) -> PipelineResult:
         # 1. Basic Output Validation
         out_res = self.output_validator.validate(generated_text)
         if out_res.status == OutputStatus.INVALID:
@@ -85,18 +224,21 @@ class GuardPipeline:
         
         final_text = out_res.sanitized_output or generated_text
 
-        # 2. Toxicity Check on Output
-        if self.toxic_detector.check(final_text).value == "toxic":
+        # 2. Toxicity Check on Output (injection/PII do not apply here, and
+        # answers often quote contact details that would trigger rescans)
+        if self.scanner.has_toxic(final_text):
             return PipelineResult(None, True, "Generated toxic content.")
 
         # 3. Hallucination Check (if context provided)
-        if context and self.hallucination_detector:
-            if self.hallucination_detector.is_hallucination(context, final_text):
+        if context:
+            detector = self.hallucination_detector
+            if detector and detector.is_hallucination(context, final_text):
                 return PipelineResult(None, True, "Hallucination detected (contradicts context).")
 
         # 4. Semantic Relevance (if query provided)
-        if query and self.semantic_validator:
+        if query:
             # Check if answer is semantically related to query (loose check)
+            # via self.semantic_validator, which loads its model on first access.
             # For strict RAG, we might check if answer is similar to context
             pass 
 
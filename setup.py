@@ -0,0 +1,36 @@
+"""
+Optional AOT build for the hot-path guardrails modules.
+
+Compiles the pure-Python validators in ``basics`` to C extensions with
+Cython; the ``.py`` sources stay next to the built ``.so`` files and are
+used whenever the extensions are absent. Compiled modules cannot be run
+with ``python -m``; delete the ``.so`` files to run their examples.
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+Without Cython the package installs as plain Python, with no extensions.
+"""
+
+from setuptools import setup
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+HOT_PATH_MODULES = [
+    "basics/_cache.py",
+    "basics/_keyword_matcher.py",
+    "basics/_regex.py",
+    "basics/content_filtering.py",
+    "basics/input_validation.py",
+    "basics/output_validation.py",
+]
+
+setup(
+    name="guardrails-learning-ext",
+    ext_modules=cythonize(
+        HOT_PATH_MODULES,
+        compiler_directives={"language_level": "3str", "boundscheck": False, "wraparound": False},
+    ) if cythonize else [],
+)
@@ -0,0 +1,107 @@
+import sys
+import os
+import re
+import types
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import advanced.custom_validators as custom_validators
+import advanced.validation_chains as validation_chains
+from advanced.custom_validators import BaseValidator, HyperscanValidator, RegexValidator, ValidationResult
+from advanced.validation_chains import ValidationChain
+
+def _stub_hyperscan():
+    """Minimal stand-in for python-hyperscan: no backreferences, and a
+    callback returning True ends the scan with ScanTerminated."""
+    hs = types.SimpleNamespace(HS_FLAG_SINGLEMATCH=1, HS_FLAG_UTF8=2, HS_FLAG_UCP=4)
+    hs.error = type("error", (Exception,), {})
+    hs.ScanTerminated = type("ScanTerminated", (hs.error,), {})
+
+    class Database:
+        def compile(self, expressions, ids, elements, flags):
+            if any(re.search(rb"\\[1-9]", e) for e in expressions):
+                raise hs.error("backreferences are not supported")
+            self._res = [(i, re.compile(e)) for i, e in zip(ids, expressions)]
+
+        def scan(self, data, match_event_handler):
+            for i, r in self._res:
+                m = r.search(data)
+                if m and match_event_handler(i, m.start(), m.end(), 0, None):
+                    raise hs.ScanTerminated()
+
+    hs.Database = Database
+    return hs
+
+class TestRegexValidator:
+    def test_matches_re_semantics(self):
+        # Same result with or without google-re2: '$' also matches before a
+        # trailing newline, and \w is Unicode-aware
+        assert RegexValidator(r'^[a-z]+$').validate('abc\n').is_valid
+        assert RegexValidator(r'^\w+$').validate('café').is_valid
+        assert not RegexValidator(r'^\d+$').validate('12a').is_valid
+
+class TestHyperscanValidator:
+    def test_stubbed_database(self, monkeypatch):
+        monkeypatch.setattr(custom_validators, "hyperscan", _stub_hyperscan())
+        validator = HyperscanValidator([r"rm\s+-rf", r"(x)\1"], "Dangerous command")
+        assert validator._db is not None
+        assert not validator.validate("rm -rf /").is_valid
+        assert not validator.validate("xx").is_valid
+        assert validator.validate("ls -la").is_valid
+
+    def test_union_fallback_with_unfusable_patterns(self, monkeypatch):
+        monkeypatch.setattr(custom_validators, "hyperscan", None)
+        validator = HyperscanValidator([r"(?i)drop\s+table", r"(y)z", r"(x)\1"])
+        assert not validator.validate("DROP TABLE users").is_valid
+        assert not validator.validate("xx").is_valid
+        assert validator.validate("hello").is_valid
+
+class _CostValidator(BaseValidator):
+    """Advances a fake clock by ``cost`` on every call."""
+    def __init__(self, clock, cost, valid=True):
+        self.clock, self.cost, self.valid = clock, cost, valid
+
+    def validate(self, value, **kwargs):
+        self.clock[0] += self.cost
+        return ValidationResult(is_valid=self.valid)
+
+class TestValidationChain:
+    def setup_method(self):
+        self.clock = [0.0]
+
+    def _chain(self, monkeypatch, *validators, **kwargs):
+        monkeypatch.setattr(validation_chains, "time", types.SimpleNamespace(perf_counter=lambda: self.clock[0]))
+        return ValidationChain(list(validators), **kwargs)
+
+    def test_reorders_cheapest_first(self, monkeypatch):
+        slow = _CostValidator(self.clock, 0.005)
+        fast = _CostValidator(self.clock, 0.001)
+        chain = self._chain(monkeypatch, slow, fast, warmup_calls=2)
+        chain.validate("x")
+        assert chain.validators == [slow, fast]
+        chain.validate("x")
+        assert chain.validators == [fast, slow]
+        explained = chain.explain()
+        assert [e["calls"] for e in explained] == [2, 2]
+        assert explained[0]["mean_time_ms"] == pytest.approx(1.0)
+        assert explained[1]["mean_time_ms"] == pytest.approx(5.0)
+
+    def test_stops_on_first_failure(self, monkeypatch):
+        failing = _CostValidator(self.clock, 0.001, valid=False)
+        never = _CostValidator(self.clock, 0.001)
+        chain = self._chain(monkeypatch, failing, never)
+        assert len(chain.validate("x")) == 1
+        assert not chain.is_valid("x")
+        assert chain.explain()[1]["calls"] == 0
+
+    def test_picks_up_edited_validators(self, monkeypatch):
+        first = _CostValidator(self.clock, 0.001)
+        chain = self._chain(monkeypatch, first)
+        chain.validate("x")
+        chain.validators.append(_CostValidator(self.clock, 0.001, valid=False))
+        assert not chain.is_valid("x")
+        chain.validators.remove(first)
+        assert [e["calls"] for e in chain.explain()] == [1]
@@ -0,0 +1,47 @@
+import sys
+import os
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prompt_engineering.chain_of_thought import CoTPromptWrapper
+from prompt_engineering.few_shot_learning import Example, FewShotPromptBuilder
+from prompt_engineering.prompt_templates import PromptTemplate
+
+class TestCoTPromptWrapper:
+    def test_mixed_case_markers(self):
+        cot = CoTPromptWrapper()
+        assert cot.parse_reasoning("3+2=5. THEREFORE, 5") == {"reasoning": "3+2=5.", "answer": "5"}
+        assert cot.parse_reasoning("Step 1.\nanswer: 7") == {"reasoning": "Step 1.", "answer": "7"}
+
+    def test_multi_word_marker_wins_over_suffix(self):
+        cot = CoTPromptWrapper()
+        assert cot.parse_reasoning("Step 1. Final Answer: 42") == {"reasoning": "Step 1.", "answer": "42"}
+
+    def test_marker_inside_word_is_ignored(self):
+        cot = CoTPromptWrapper()
+        assert cot.parse_reasoning("Please reanswer: later") == {"full_response": "Please reanswer: later"}
+        assert cot.parse_reasoning("No marker here") == {"full_response": "No marker here"}
+
+class TestPromptTemplate:
+    def test_format_and_read_only_source(self):
+        template = PromptTemplate("Hi ${name}, $$5 for $item")
+        assert template.format(name="Ann") == "Hi Ann, $5 for $item"
+        assert template.template_str == "Hi ${name}, $$5 for $item"
+        with pytest.raises(AttributeError):
+            template.template_str = "other"
+
+class TestFewShotPromptBuilder:
+    def test_examples_stay_in_sync_with_prompt(self):
+        builder = FewShotPromptBuilder("Classify.", [Example("good", "Positive")])
+        builder.add_example(Example("bad", "Negative"))
+        assert builder.examples == (Example("good", "Positive"), Example("bad", "Negative"))
+        assert builder.build("meh") == (
+            "Classify.\n\nInput: good\nOutput: Positive\n\nInput: bad\nOutput: Negative\n\nInput: meh\nOutput:"
+        )
+        with pytest.raises(AttributeError):
+            builder.examples.append(Example("x", "y"))
+        with pytest.raises(AttributeError):
+            builder.examples = []
@@ -0,0 +1,74 @@
+import asyncio
+import sys
+import os
+import threading
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+np = pytest.importorskip("numpy")
+
+from applications.rag_with_validation import SemanticCache, SimpleRAG
+
+class _KeywordEncoder:
+    """Stub encoder: one axis per known keyword, plus one for anything else."""
+    WORDS = ["python", "rust", "java"]
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True):
+        embs = np.zeros((len(texts), len(self.WORDS) + 1), dtype=np.float32)
+        for row, text in zip(embs, texts):
+            for i, word in enumerate(self.WORDS):
+                row[i] = text.lower().count(word)
+            row[-1] = 0.1
+        return embs / np.linalg.norm(embs, axis=1, keepdims=True)
+
+class _CountingDetector:
+    """Stub NLI detector that never flags and counts checked answers."""
+    def __init__(self):
+        self.checked = 0
+        self._lock = threading.Lock()
+
+    def is_hallucination(self, source, output):
+        with self._lock:
+            self.checked += len(output) if isinstance(output, list) else 1
+        return [False] * len(output) if isinstance(output, list) else False
+
+class TestSimpleRAG:
+    def setup_method(self):
+        self.rag = SimpleRAG()
+        self.rag.encoder = _KeywordEncoder()
+        self.rag.semantic_cache = SemanticCache(self.rag.encoder)
+        self.rag._kb_emb = self.rag._encode(list(self.rag.knowledge_base.values()))
+        self.detector = self.rag.hallucination_detector = _CountingDetector()
+
+    def teardown_method(self):
+        self.rag.close()
+
+    def test_query_is_a_coroutine(self):
+        answer = asyncio.run(self.rag.query("Tell me about python"))
+        assert answer.startswith("Based on the context: Python")
+        assert asyncio.run(self.rag.query("Tell me about java")) == "No relevant information found."
+
+    def test_cache_miss_then_hit(self):
+        first = asyncio.run(self.rag.batch_query(["Tell me about python"]))
+        assert self.detector.checked == 1
+        # Same embedding: served from the cache, no second NLI check
+        assert asyncio.run(self.rag.query("python please")) == first[0]
+        assert self.detector.checked == 1
+
+    def test_concurrent_batch_queries(self):
+        queries = ["What is rust?", "Tell me about python", "java?"]
+
+        async def run_all():
+            return await asyncio.gather(*(self.rag.batch_query(queries) for _ in range(8)))
+
+        results = asyncio.run(run_all())
+        assert all(r == results[0] for r in results)
+        assert results[0][2] == "No relevant information found."
+        assert len(self.rag.semantic_cache._responses) >= 2
+        checked = self.detector.checked
+        # Every answerable query is cached now
+        assert asyncio.run(self.rag.batch_query(queries[:2])) == results[0][:2]
+        assert self.detector.checked == checked